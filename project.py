@@ -4,21 +4,78 @@ This module combines all of the modular components for the workspace launcher
 """
 
 #region Imports
-from dataclasses import dataclass
+from array import array
+from collections.abc import Sequence
+from copy import deepcopy
+from dataclasses import asdict, dataclass, field, fields, replace
+from functools import lru_cache, partial
+from contextlib import contextmanager
 from sm_utils import file_path
 from os import path, getlogin, scandir
+import os
 import urllib.parse as up
 from pathlib import Path
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, FIRST_COMPLETED, wait
+from typing import BinaryIO, Callable, ClassVar, Iterable, Iterator, TextIO, get_origin
 import sys
+import argparse
+import csv
+import asyncio
+import threading
+import queue
+import time
+import re
+import shlex
 import json
 import shutil
+import tempfile
+import socket
+import secrets
+import hmac
+import sqlite3
+import mmap
+import struct
+import heapq
+import zlib
 import webbrowser
-import PySimpleGUI as sg
+import glob
+from xml.etree import ElementTree
 import subprocess
 import platform
+import getpass
+try:
+    import curses
+except ImportError:
+    # Only the terminal UI needs curses (Windows needs the windows-curses package for it)
+    curses = None
+try:
+    # File locks on Windows
+    import msvcrt
+except ImportError:
+    msvcrt = None
+try:
+    # File locks elsewhere
+    import fcntl
+except ImportError:
+    fcntl = None
+# PySimpleGUI is imported by 'import_gui' once a window is needed (importing it needs Tk, which the terminal UI and the reports don't)
+sg = None
+try:
+    # User accounts on Linux and macOS
+    import pwd
+except ImportError:
+    pwd = None
+try:
+    # User profiles on Windows
+    import winreg
+except ImportError:
+    winreg = None
 #endregion
 
 #region WorkspaceSettings
+class SettingsError(ValueError):
+    """Raised when a settings file or dictionary is not valid"""
+
 @dataclass
 class WorkspaceSettings:
     """Settings model"""
@@ -29,58 +86,299 @@ class WorkspaceSettings:
     username: str="default"         # Username
     hide_missing: bool=True         # When true, missing workspace folders are omitted from the select list
     clean_up_orphans: bool=False    # When true, missing workspace folders have their related VSC folders removed
+    clean_up_duplicates: bool=False # When true, redundant VSC folders for an already listed workspace are removed
+    compact_state: bool=False       # When true, the VS Code state databases of existing workspaces are checkpointed and vacuumed in the background after a scan
     show_repos: bool=True           # When true, the repository URL is shown in the select list
     font: str="Consolas"            # Name of font to use in the UI
     font_size: int=10               # Size of the font to use in the UI
     show_glyphs: bool=False         # When true, a glyph is prepended to the repository URL
     x_location: int=10              # Horizontal location of the UI in pixels from the left of the screen
     y_location: int=-160            # Vertical location of the UI in pixels from the top of the screen
+    max_concurrency: int=16         # Maximum number of file system operations run at once during discovery
+    io_timeout: float=5.0           # Seconds to wait for a single file system operation before giving up on it
+    batch_concurrency: int=2        # Maximum number of VS Code launches running at once when opening all listed workspaces
+    batch_delay: float=1.0          # Seconds to wait between VS Code launches when opening all listed workspaces
+    show_details: bool=True         # When true, details (branch, last commit, size, etc.) of the selected workspace are shown
+    details_ttl: float=30.0         # Seconds before the git details and last opened time of a workspace are read again
+    size_ttl: float=600.0           # Seconds before the size of a workspace is calculated again
+    sort_by: str="name"             # Order of the select list: "name" (parent > name) or "recent" (most recently used first)
+    data_path: str="default"        # Folder where the launcher keeps its own files (e.g. the workspace snapshot)
+    use_snapshot: bool=False        # When true, the workspace list is loaded from the snapshot of the last scan if nothing was added or removed since
+    ui_mode: str="combo"            # UI to show: "combo" (filter box and drop-down list), "quick_pick" (live top matches, Enter launches) or "tree" (grouped)
+    quick_pick_size: int=10         # Number of matches shown in the quick pick UI
+    prewarm_vscode: bool=False      # When true, VS Code is started (minimized) when the launcher opens if it isn't already running
+    window_mode: str="default"      # Window used by VS Code for a launched workspace: "default", "new" (--new-window) or "reuse" (--reuse-window)
+    orphan_min_scans: int=3         # Number of scans a workspace folder must be missing in before clean_up_orphans removes it
+    orphan_min_days: float=7.0      # Number of days a workspace folder must be missing for before clean_up_orphans removes it
+    compact_concurrency: int=2      # Maximum number of state databases compacted at once
+    prefetch: bool=False            # When true, the source files of a selected workspace are read into the file cache while VS Code starts
+    prefetch_max_mb: float=256.0    # Maximum number of megabytes read ahead per workspace
+    prefetch_file_mb: float=1.0     # Files larger than this many megabytes are not read ahead
+    prefetch_mb_per_second: float=64.0  # Maximum read ahead speed in megabytes per second
+    show_weight: bool=False         # When true, analyzed workspaces with many files are marked in the list, and a selected workspace is analyzed
+    weight_heavy_files: int=20000   # Number of files from which a workspace counts as heavy (ten times as many: huge)
+    weight_ttl: float=7.0           # Days before the weight of a workspace is analyzed again
+    profile_concurrency: int=4      # Maximum number of user profiles scanned at once by the machine-wide inventory (--all-users)
+    profile_rate: float=50.0        # Maximum number of VS Code folders read per second in each user profile by the inventory
+    profile_budget: float=60.0      # Seconds after which the inventory stops scanning a user profile
+    providers: list[str]=field(default_factory=lambda: ["folder"])
+                                    # Other sources of workspaces, read alongside VS Code: "folder" (source_roots), "jetbrains", "visualstudio"
+    provider_timeout: float=10.0    # Seconds to wait for each provider before leaving its workspaces out
+    background_refresh: bool=False  # When true, the listed workspaces are re-checked in the background while the UI is open
+    refresh_budget: int=8           # Maximum number of workspaces re-checked per second by the background refresh
+    refresh_min_interval: float=60.0    # Seconds between checks of recently used or recently changed workspaces
+    refresh_max_interval: float=3600.0  # Seconds between checks of idle, slow or unreachable workspaces
+    tree_group_by: str="parent"     # Groups of the tree UI: "parent" (parent folder) or "host" (repository host)
+    single_instance: bool=False     # When true, starting the launcher again shows the running launcher instead of opening another one
+    stay_resident: bool=False       # When true (with single_instance), closing the window only hides it, so it shows again instantly
+    instance_port: int=0            # Local port used by single_instance (0 picks a port from the username)
+    source_roots: list[str]=field(default_factory=list)
+                                    # Folders searched for git repositories VS Code hasn't opened yet
+    source_depth: int=3             # Number of folder levels below each source root that are searched
+    source_skip: list[str]=field(default_factory=lambda: list(WorkspaceSettings._default_source_skip))
+                                    # Folder names never searched (dependency, environment and build folders)
+    repo_hosts: dict[str, str]=field(default_factory=lambda: dict(WorkspaceSettings._default_repo_hosts))
+                                    # Repository hosts: {host: regular expression matched against the repository URI}, first match wins
     #endregion
 
+    # Settings that must be greater than zero
+    _positive: ClassVar[tuple[str, ...]] = ("font_size", "max_concurrency", "io_timeout", "batch_concurrency", "details_ttl", "size_ttl", "quick_pick_size",
+                                                "orphan_min_scans", "refresh_budget", "refresh_min_interval", "refresh_max_interval",
+                                                "source_depth", "compact_concurrency", "prefetch_max_mb", "prefetch_file_mb",
+                                                "prefetch_mb_per_second", "weight_heavy_files", "weight_ttl",
+                                                "profile_concurrency", "profile_rate", "profile_budget", "provider_timeout")
+    # Settings that must not be negative
+    _non_negative: ClassVar[tuple[str, ...]] = ("batch_delay", "orphan_min_days", "instance_port")
+    # Settings that only accept certain values
+    _choices: ClassVar[dict[str, tuple[str, ...]]] = {"sort_by": ("name", "recent"), "ui_mode": ("combo", "quick_pick", "tree"),
+                                                         "window_mode": ("default", "new", "reuse"), "tree_group_by": ("parent", "host"),
+                                                         "providers": ("folder", "jetbrains", "visualstudio")}
+    # Repository hosts recognized when repo_hosts isn't set (URIs matching none of them are "self-hosted")
+    _default_repo_hosts: ClassVar[dict[str, str]] = {"github": r"github\.com", "gitlab": r"gitlab\.", "bitbucket": r"bitbucket\.org",
+                                                     "azure": r"dev\.azure\.com|\.visualstudio\.com"}
+    # Folders skipped when searching the source roots if source_skip isn't set
+    _default_source_skip: ClassVar[tuple[str, ...]] = ("node_modules", ".venv", "venv", "env", "__pycache__", ".tox", ".mypy_cache",
+                                                       "bin", "obj", "build", "dist", "target", ".idea", ".vs", ".vscode")
+    # Profile folders that don't belong to a user (Windows)
+    _system_profiles: ClassVar[tuple[str, ...]] = ("all users", "default", "default user", "defaultuser0", "public")
+    # Login shells of accounts that can't log in (services), which never have a profile worth scanning
+    _no_login_shells: ClassVar[tuple[str, ...]] = ("nologin", "false", "sync", "shutdown", "halt")
+    # Windows registry key listing the user profiles
+    _profile_list_key: ClassVar[str] = r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\ProfileList"
+    # Settings loaded from JSON files: {real path: (mtime, settings)}
+    _files: ClassVar[dict[str, tuple[float, "WorkspaceSettings"]]] = {}
+
     def __post_init__(self):
         """Initialize the default values if necessary"""
-        if self.username == "default":
-            self.username = WorkspaceSettings._get_user(self.username)
-        if self.exe_path == "default" or self.workspace_path == "default":
-            self.exe_path, self.workspace_path = WorkspaceSettings._get_user_paths(self.username, self.exe_path, self.workspace_path)
+        # Obtain the paths that are relative to the user (these lookups are cached)
+        self.username = WorkspaceSettings._get_user(self.username)
+        self.exe_path, self.workspace_path = WorkspaceSettings._get_user_paths(self.username, self.exe_path, self.workspace_path)
+        self.data_path = WorkspaceSettings._get_data_path(self.username, self.data_path)
 
     #region Static Factory Methods
     @classmethod
-    def from_file(cls, filename: str, folder: str=None) -> "WorkspaceSettings":
-        """Factory for creating WorkspaceSettings from a JSON file"""
+    def from_file(cls, filename: str, folder: str=None, check_storage: bool=True) -> "WorkspaceSettings":
+        """Factory for creating WorkspaceSettings from a JSON file (parsed again only once the file changes)
+
+        check_storage is False for callers that don't scan the workspace_path folder (e.g. the inventory of every profile).
+        """
         filepath = file_path(filename, folder)
         if not path.isfile(filepath):
             # If the JSON file doesn't exist, we can only return the default settings
             return cls()
-        settings = json.loads(Path(filepath).read_text())
-        return WorkspaceSettings.from_dict(settings)
+        real_path = path.realpath(filepath)
+        mtime = path.getmtime(real_path)
+        cached = cls._files.get(real_path)
+        if cached and cached[0] == mtime:
+            # A deep copy, so a caller changing its settings (or a list in them) doesn't change those of every other caller
+            settings = deepcopy(cached[1])
+        else:
+            try:
+                settings_dict = json.loads(Path(real_path).read_text(encoding="utf-8"))
+            except ValueError as e:
+                raise SettingsError(f"{real_path} is not a valid JSON file: {e}") from e
+            try:
+                settings = cls.from_dict(settings_dict, check_storage=False)
+            except SettingsError as e:
+                raise SettingsError(f"{real_path}: {e}") from e
+            cls._files[real_path] = (mtime, deepcopy(settings))
+        if check_storage:
+            try:
+                settings.check_storage()
+            except SettingsError as e:
+                raise SettingsError(f"{real_path}: {e}") from e
+        return settings
 
     @classmethod
-    def from_dict(cls, settings: dict[str, any]) -> "WorkspaceSettings":
+    def from_dict(cls, settings: dict[str, any], check_storage: bool=True) -> "WorkspaceSettings":
         """Factory for creating WorkspaceSettings from a settings dictionary"""
+        cls.validate(settings)
         settings = cls(**settings)
-        # Obtain the paths that are relative to the user
-        settings.username = WorkspaceSettings._get_user(settings.username)
-        settings.exe_path, settings.workspace_path = WorkspaceSettings._get_user_paths(
-            settings.username, settings.exe_path, settings.workspace_path)
+        if check_storage:
+            settings.check_storage()
         return settings
+
+    def check_storage(self) -> None:
+        """Check that the workspace_path folder exists (raises SettingsError if it doesn't)"""
+        if not path.isdir(self.workspace_path):
+            # Fail now instead of scanning a folder that isn't there
+            raise SettingsError(f"workspace_path '{self.workspace_path}' is not a folder")
+
+    def for_user(self, username: str, home: str=None) -> "WorkspaceSettings":
+        """Copy of the settings for another user's profile (their VS Code paths; the launcher's data_path and no source roots)
+
+        home is the user's profile folder (from 'profile_homes'), which is looked up by name when None.
+        """
+        if home is None:
+            return replace(self, username=username, exe_path="default", workspace_path="default", source_roots=[])
+        exe_path, workspace_path = WorkspaceSettings._get_profile_paths(home, "default", "default")
+        return replace(self, username=username, exe_path=exe_path, workspace_path=workspace_path, source_roots=[])
     #endregion
 
     #region Static Helper Functions
     @classmethod
+    def validate(cls, settings: dict[str, any]) -> None:
+        """Check a settings dictionary against the settings attributes (raises SettingsError listing every problem)"""
+        if not isinstance(settings, dict):
+            raise SettingsError("settings must be a JSON object")
+        types = {f.name: get_origin(f.type) or f.type for f in fields(cls)}
+        errors = [f"unknown setting '{key}'" for key in settings if key not in types]
+        for key, value in settings.items():
+            expected = types.get(key)
+            if expected is None:
+                continue
+            # JSON has no separate integer type for floats, but booleans must not pass as numbers
+            valid_type = (int, float) if expected is float else expected
+            if (isinstance(value, bool) and expected is not bool) or not isinstance(value, valid_type):
+                errors.append(f"'{key}' must be of type {expected.__name__} (got {json.dumps(value)})")
+            elif key in cls._positive and value <= 0:
+                errors.append(f"'{key}' must be greater than 0 (got {value})")
+            elif key in cls._non_negative and value < 0:
+                errors.append(f"'{key}' must not be negative (got {value})")
+            elif key in cls._choices and expected is not list and value not in cls._choices[key]:
+                errors.append(f"'{key}' must be one of {', '.join(cls._choices[key])} (got {json.dumps(value)})")
+            elif key == "repo_hosts":
+                errors.extend(cls._validate_patterns(key, value))
+            elif expected is list:
+                errors.extend(f"'{key}' must only contain strings (got {json.dumps(item)})" for item in value if not isinstance(item, str))
+                if key in cls._choices:
+                    errors.extend(f"'{key}' items must be one of {', '.join(cls._choices[key])} (got {json.dumps(item)})"
+                                  for item in value if isinstance(item, str) and item not in cls._choices[key])
+        if errors:
+            raise SettingsError("; ".join(errors))
+
+    @classmethod
+    def _validate_patterns(cls, key: str, patterns: dict[str, any]) -> list[str]:
+        """Check a dictionary of regular expressions (returns the problems found)"""
+        errors = []
+        for name, pattern in patterns.items():
+            if not isinstance(pattern, str):
+                errors.append(f"'{key}.{name}' must be of type str (got {json.dumps(pattern)})")
+                continue
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                errors.append(f"'{key}.{name}' is not a valid regular expression: {e}")
+        return errors
+
+    @classmethod
+    @lru_cache(maxsize=None)
     def _get_user(cls, username: str) -> str:
         """Get the username for the settings"""
-        return getlogin() if username.lower() == "default" else username
+        if username.lower() != "default":
+            return username
+        try:
+            return getlogin()
+        except OSError:
+            # No controlling terminal (e.g. a service or a non-interactive SSH session)
+            return getpass.getuser()
+
+    @classmethod
+    def profile_users(cls, homes: dict[str, str]=None) -> list[str]:
+        """Get the users whose profile folder (from 'profile_homes' when homes is None) holds VS Code workspaces"""
+        homes = WorkspaceSettings.profile_homes() if homes is None else homes
+        # Profiles that can't be read are kept, so the scan reports them instead of silently leaving them out
+        return [user for user, home in homes.items()
+                if path.isdir(WorkspaceSettings._get_profile_paths(home, "default", "default")[1]) or not os.access(home, os.R_OK | os.X_OK)]
+
+    @classmethod
+    def profile_homes(cls) -> dict[str, str]:
+        """Get the profile folder of each user account on the machine, by user
+
+        The accounts come from the password database on Linux and macOS (skipping service accounts that can't log in)
+          and from the registry's profile list on Windows, since a profile folder isn't always named after its user.
+        """
+        homes: dict[str, str] = {}
+        if pwd:
+            for account in sorted(pwd.getpwall(), key=lambda a: a.pw_name):
+                if path.basename(account.pw_shell) in WorkspaceSettings._no_login_shells or path.dirname(account.pw_dir) == account.pw_dir:
+                    continue
+                if path.isdir(account.pw_dir) and account.pw_dir not in homes.values():
+                    homes[account.pw_name] = account.pw_dir
+            return homes
+        if winreg:
+            try:
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, WorkspaceSettings._profile_list_key) as profiles:
+                    for index in range(winreg.QueryInfoKey(profiles)[0]):
+                        sid = winreg.EnumKey(profiles, index)
+                        if not sid.startswith("S-1-5-21-"):
+                            # Only local and domain user accounts (not SYSTEM, LOCAL SERVICE and NETWORK SERVICE)
+                            continue
+                        with winreg.OpenKey(profiles, sid) as profile:
+                            home = path.expandvars(winreg.QueryValueEx(profile, "ProfileImagePath")[0])
+                        if path.isdir(home):
+                            homes[path.basename(home)] = home
+                return dict(sorted(homes.items()))
+            except OSError:
+                # Fall back to the folders next to the current user's profile
+                pass
+        profiles_root = path.dirname(path.expanduser("~"))
+        try:
+            with scandir(profiles_root) as entries:
+                return {e.name: e.path for e in sorted(entries, key=lambda e: e.name)
+                        if e.is_dir() and e.name.lower() not in WorkspaceSettings._system_profiles}
+        except OSError:
+            return {}
 
     @classmethod
+    @lru_cache(maxsize=None)
     def _get_user_paths(cls, username: str, exe_path: str, ws_path: str) -> tuple[str, str]:
-        """Get the AppData paths for the settings user"""
-        user_path = path.expanduser(f"~{username}")
+        """Get the AppData paths for the settings user (the VS Code paths for Linux and macOS elsewhere)"""
+        return WorkspaceSettings._get_profile_paths(path.expanduser(f"~{username}"), exe_path, ws_path)
+
+    @classmethod
+    def _get_profile_paths(cls, user_path: str, exe_path: str, ws_path: str) -> tuple[str, str]:
+        """Get the VS Code paths within a user's profile folder"""
+        if platform.system() != "Windows":
+            return WorkspaceSettings._get_posix_paths(user_path, exe_path, ws_path)
         if exe_path.lower() == "default":
             exe_path = path.join(user_path, "AppData\\Local\\Programs\\Microsoft VS Code\\Code.exe")
         if ws_path.lower() == "default":
             ws_path = path.join(user_path, "AppData\\Roaming\\Code\\User\\workspaceStorage")
         return (exe_path, ws_path)
+
+    @classmethod
+    def _get_posix_paths(cls, user_path: str, exe_path: str, ws_path: str) -> tuple[str, str]:
+        """Get the VS Code paths on Linux and macOS (the 'code' command and the desktop or VS Code Server storage)"""
+        if exe_path.lower() == "default":
+            exe_path = shutil.which("code") or "code"
+        if ws_path.lower() == "default":
+            config_path = "Library/Application Support" if platform.system() == "Darwin" else ".config"
+            candidates = [path.join(user_path, config_path, "Code/User/workspaceStorage"),
+                          # VS Code Server (Remote - SSH) keeps the storage of the folders opened on this host here
+                          path.join(user_path, ".vscode-server/data/User/workspaceStorage")]
+            ws_path = next((candidate for candidate in candidates if path.isdir(candidate)), candidates[0])
+        return (exe_path, ws_path)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _get_data_path(cls, username: str, data_path: str) -> str:
+        """Get the folder for the launcher's own files for the settings user"""
+        if data_path.lower() != "default":
+            return data_path
+        if platform.system() != "Windows":
+            return path.join(path.expanduser(f"~{username}"), ".local/share/WorkspaceLauncher")
+        return path.join(path.expanduser(f"~{username}"), "AppData\\Local\\WorkspaceLauncher")
     #endregion
 #endregion
 
@@ -98,48 +396,52 @@ class Workspace:
     exists:     bool=False  # True if the workspace folder is defined and exists
     show_repo:  bool=True   # When True, show the repository in the display name
     show_glyph: bool=True   # When True, show the glyph in the display name
+    last_opened: float=None # Timestamp of the last time VS Code used the workspace
+    recent_rank: int=None   # Position in VS Code's recently opened list (0 is the most recent, None if not listed)
+    source:     str="vscode"    # Editor the workspace was found in
+    repo_host:  str=None    # Host of the repository ("github", "gitlab", ..., or "self-hosted"), classified when the workspace is loaded
+    user:       str=None    # User whose VS Code profile the workspace was found in (only set by WorkspaceInventory)
     #endregion
 
+    # Parsed git config files shared by all workspaces: {real path: (mtime, repository URI)}
+    _git_configs: ClassVar[dict[str, tuple[float, str]]] = {}
+    # Nerd font glyphs shown before the repository URI for each host
+    host_glyphs: ClassVar[dict[str, str]] = {"github": "\uf408", "bitbucket": "\uf171", "gitlab": "\uf296", "azure": "\uebd8"}
+    # SSH remotes: git@host:path and ssh://[user@]host[:port]/path
+    _scp_uri: ClassVar[re.Pattern] = re.compile(r"^(?:[\w.-]+@)?(?P<host>[\w.-]{2,}):(?!//)(?P<path>.+)$")
+    _ssh_uri: ClassVar[re.Pattern] = re.compile(r"^(?:ssh|git\+ssh)://(?:[^@/]+@)?(?P<host>[\w.-]+)(?::\d+)?/(?P<path>.+)$")
+
     #region Properties
     @property
     def display_name(self) -> str:
         """Display name for the workspace when presented to the user"""
         name: str = f"{self.parent} > {self.name}"
         missing: bool = "" if self.exists else " (missing)"
-        bb_glyph: str = " " if self.show_glyph else ""
-        gh_glyph: str = " " if self.show_glyph else ""
         repo: str = ""
         if self.repo_uri and self.show_repo:
-            if "github.com" in self.repo_uri.lower():
-                repo = f" | {bb_glyph}{self.repo_uri}"
-            elif "bitbucket.org" in self.repo_uri.lower():
-                repo = f" | {gh_glyph}{self.repo_uri}"
-            else:
-                repo = f" | {self.repo_uri}"
+            glyph: str = Workspace.host_glyphs.get(self.repo_host) if self.show_glyph else None
+            repo = f" | {glyph} {self.repo_uri}" if glyph else f" | {self.repo_uri}"
         return f"{name}{repo}{missing}"
+
+    @property
+    def repo_url(self) -> str:
+        """Browsable HTTPS URL of the repository (None if there is no repository)"""
+        return Workspace.browse_url(self.repo_uri) if self.repo_uri else None
     #endregion
 
     #region Static Factory Methods
     @classmethod
-    def from_vscode_folder(cls, vsc_folder: str, show_repo: bool=True, show_glyph: bool=False) -> "Workspace":
+    def from_vscode_folder(cls, vsc_folder: str, show_repo: bool=True, show_glyph: bool=False, repo_hosts: dict[str, str]=None) -> "Workspace":
         """Factory: Initialize from vscode folder path only"""
-        if vsc_folder is None or not path.isdir(vsc_folder):
-            # If the VSCode folder does not exist, we cannot create a Workspace object
-            return None
-        json_path = path.join(vsc_folder, "workspace.json")
-        if not path.isfile(json_path):
-            # If the workspace.json file does not exist, we cannot create a Workspace object
-            return None
-        json_data = json.loads(Path(json_path).read_text(encoding="utf-8"))
-        if "folder" not in json_data:
-            # If the JSON data does not contain 'folder', we cannot create a Workspace object
+        ws_path = Workspace.read_workspace_folder(vsc_folder)
+        if ws_path is None:
+            # If the VSCode folder does not describe a workspace folder, we cannot create a Workspace object
             return None
-        # Decode the URL-encoded workspace folder path
-        ws_path = up.unquote(json_data["folder"][8:]).replace("/", "\\")
-        return Workspace.from_workspace_folder(ws_path, vsc_folder, show_repo, show_glyph)
+        return Workspace.from_workspace_folder(ws_path, vsc_folder, show_repo, show_glyph, repo_hosts)
 
     @classmethod
-    def from_workspace_folder(cls, workspace_folder: str, vsc_folder: str=None, show_repo: bool=True, show_glyph: bool=False) -> "Workspace":
+    def from_workspace_folder(cls, workspace_folder: str, vsc_folder: str=None, show_repo: bool=True, show_glyph: bool=False,
+                              repo_hosts: dict[str, str]=None) -> "Workspace":
         """Factory: Initialize from workspace folder path only"""
         # Create the Workspace object and set the folder paths
         ws = cls()
@@ -159,62 +461,2368 @@ class Workspace:
             return ws if ws.vsc_folder else None
         # Workspace folder exists
         ws.exists = True
-        git_folder= path.join(ws.workspace, ".git")
-        if not path.isdir(git_folder):
-            # If there is no .git directory, we're done
-            return ws
-        git_file = path.join(git_folder, "config")
-        if not path.isfile(git_file):
-            # If the .git directory doesn't contain a 'config' file, we're done
+        git_folder = Workspace.find_git_folder(ws.workspace)
+        if not git_folder:
+            # If there is no .git directory (or .git file pointing to one), we're done
             return ws
-        git_list = [line for line in Path(git_file).read_text().splitlines() if line.strip().lower().startswith("url")]
-        if not git_list:
-            # If there is no URL in the Git config file, we're done
+        git_file = Workspace.find_git_config(git_folder)
+        if not git_file:
+            # If the git directory doesn't have a 'config' file, we're done
             return ws
-        git_data = git_list[0]
-        # Add the Git URL to the Workspace object
-        ws.repo_uri = git_data.split("=")[1].strip()
+        # Add the Git URL (if the config file has one) and its host to the Workspace object
+        ws.repo_uri = Workspace.read_repo_uri(git_file)
+        ws.repo_host = Workspace.classify_repo_host(ws.repo_uri, repo_hosts)
         return ws
     #endregion
+
+    #region Static Helper Functions
+    @classmethod
+    def classify_repo_host(cls, repo_uri: str, repo_hosts: dict[str, str]=None) -> str:
+        """Get the host of a repository URI ("self-hosted" if no host pattern matches, None if there is no URI)"""
+        if not repo_uri:
+            return None
+        hosts = tuple((repo_hosts if repo_hosts is not None else WorkspaceSettings._default_repo_hosts).items())
+        matcher, names = Workspace._host_matcher(hosts)
+        match = matcher.search(repo_uri) if matcher else None
+        return names[match.lastgroup] if match else "self-hosted"
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _host_matcher(cls, hosts: tuple[tuple[str, str], ...]) -> tuple[re.Pattern, dict[str, str]]:
+        """Compile the host patterns into one case-insensitive alternation (returns the pattern and {group: host})"""
+        if not hosts:
+            return (None, {})
+        names = {f"host{i}": name for i, (name, _) in enumerate(hosts)}
+        return (re.compile("|".join(f"(?P<host{i}>{pattern})" for i, (_, pattern) in enumerate(hosts)), re.IGNORECASE), names)
+
+    @classmethod
+    def browse_url(cls, repo_uri: str) -> str:
+        """Get a browsable HTTPS URL for a repository URI (SSH remotes are converted, credentials and '.git' are dropped)"""
+        match = Workspace._ssh_uri.match(repo_uri) or (None if "://" in repo_uri else Workspace._scp_uri.match(repo_uri))
+        if match:
+            host, repo_path = match["host"], match["path"].strip("/")
+            if host.lower() == "ssh.dev.azure.com" and repo_path.startswith("v3/"):
+                # Azure DevOps: v3/organization/project/repository
+                parts = repo_path[3:].split("/")
+                if len(parts) == 3:
+                    host, repo_path = "dev.azure.com", f"{parts[0]}/{parts[1]}/_git/{parts[2]}"
+            url = f"https://{host}/{repo_path}"
+        else:
+            url = re.sub(r"^(https?://)[^@/]+@", r"\1", repo_uri)
+        return url[:-4] if url.endswith(".git") else url
+
+    @classmethod
+    def read_workspace_folder(cls, vsc_folder: str) -> str:
+        """Get the workspace folder path described by a vscode folder (None if there isn't one)"""
+        if vsc_folder is None or not path.isdir(vsc_folder):
+            # If the VSCode folder does not exist, there is no workspace folder
+            return None
+        json_path = path.join(vsc_folder, "workspace.json")
+        if not path.isfile(json_path):
+            # If the workspace.json file does not exist, there is no workspace folder
+            return None
+        json_data = json.loads(Path(json_path).read_text(encoding="utf-8"))
+        if "folder" not in json_data:
+            # If the JSON data does not contain 'folder', there is no workspace folder
+            return None
+        return Workspace.folder_from_uri(json_data["folder"])
+
+    @classmethod
+    def folder_from_uri(cls, folder_uri: str) -> str:
+        """Get the folder path from a VS Code folder URI (None if it is not a local file URI)"""
+        if folder_uri.lower().startswith("file:///"):
+            # Decode the URL-encoded workspace folder path
+            folder = up.unquote(folder_uri[7:])
+        elif folder_uri.lower().startswith("vscode-remote://") and path.sep == "/":
+            # VS Code Server records the folders opened on this host with the remote authority in front
+            folder = up.unquote(up.urlsplit(folder_uri).path)
+        else:
+            return None
+        if path.sep == "\\":
+            # "/d:/Code" is "d:\\Code" on Windows
+            return folder.lstrip("/").replace("/", "\\")
+        return folder
+
+    @classmethod
+    def normalize_path(cls, workspace_folder: str) -> str:
+        """Get a comparison key for a workspace folder (ignores case and trailing separators on Windows)"""
+        return path.normcase(path.normpath(workspace_folder.rstrip("\\/") or workspace_folder))
+    #endregion
+
+    #region Git Helper Functions
+    @classmethod
+    def find_git_folder(cls, workspace_folder: str) -> str:
+        """Get the git directory for a workspace folder (follows the 'gitdir:' pointer of worktrees and submodules)"""
+        git_path = path.join(workspace_folder, ".git")
+        if path.isdir(git_path):
+            return git_path
+        if not path.isfile(git_path):
+            return None
+        # Worktrees and submodules have a .git file containing 'gitdir: <path to the real git directory>'
+        pointer = Path(git_path).read_text(encoding="utf-8", errors="replace").strip()
+        if not pointer.lower().startswith("gitdir:"):
+            return None
+        git_folder = path.normpath(path.join(workspace_folder, pointer[7:].strip()))
+        return git_folder if path.isdir(git_folder) else None
+
+    @classmethod
+    def find_git_config(cls, git_folder: str) -> str:
+        """Get the config file for a git directory (worktrees use the config of the repository they belong to)"""
+        common_file = path.join(git_folder, "commondir")
+        if path.isfile(common_file):
+            common_dir = Path(common_file).read_text(encoding="utf-8", errors="replace").strip()
+            git_folder = path.normpath(path.join(git_folder, common_dir))
+        git_file = path.join(git_folder, "config")
+        return git_file if path.isfile(git_file) else None
+
+    @classmethod
+    def read_repo_uri(cls, git_file: str) -> str:
+        """Get the repository URI from a git config file (parsed once per repository until the file changes)"""
+        real_path = path.realpath(git_file)
+        mtime = path.getmtime(real_path)
+        cached = cls._git_configs.get(real_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        repo_uri = cls.parse_repo_uri(Path(real_path).read_text(encoding="utf-8", errors="replace"))
+        cls._git_configs[real_path] = (mtime, repo_uri)
+        return repo_uri
+
+    @classmethod
+    def parse_repo_uri(cls, git_config: str) -> str:
+        """Get the URL of the 'origin' remote from git config text (falls back to the first remote URL)"""
+        section, subsection, first_url = "", "", None
+        for line in git_config.splitlines():
+            line = line.strip()
+            if not line or line[0] in "#;":
+                continue
+            header = re.match(r'\[\s*([^\s\]"]+)(?:\s+"(.*)")?\s*\]', line)
+            if header:
+                section, subsection = header.group(1).lower(), header.group(2) or ""
+                continue
+            key, _, value = line.partition("=")
+            if section != "remote" or key.strip().lower() != "url":
+                continue
+            if subsection == "origin":
+                return value.strip()
+            first_url = first_url or value.strip()
+        return first_url
+    #endregion
+#endregion
+
+#region VSCodeState
+class VSCodeState:
+    """Read-only access to the recently opened folders in VS Code's global state"""
+
+    # Key of the recently opened list in the global state database
+    recent_key: ClassVar[str] = "history.recentlyOpenedPathsList"
+
+    #region Constructor
+    def __init__(self, workspace_path: str) -> None:
+        """Initialize from the workspace storage path (the global storage folder is next to it)"""
+        self.user_folder = path.dirname(path.normpath(workspace_path))
+        self.global_storage = path.join(self.user_folder, "globalStorage")
+    #endregion
+
+    #region Helper Functions
+    def recent_folders(self) -> list[str]:
+        """Get the recently opened workspace folders, most recent first"""
+        items = VSCodeState.read_items(path.join(self.global_storage, "state.vscdb"), [VSCodeState.recent_key])
+        if VSCodeState.recent_key in items:
+            recent = json.loads(items[VSCodeState.recent_key])
+        else:
+            # Older versions of VS Code kept the list in storage.json
+            recent = VSCodeState._read_storage_json(
+                path.join(self.global_storage, "storage.json"), path.join(path.dirname(self.user_folder), "storage.json"))
+        entries = recent.get("entries", []) or [{"folderUri": uri} for uri in recent.get("workspaces3", []) if isinstance(uri, str)]
+        folders = [Workspace.folder_from_uri(e["folderUri"]) for e in entries if isinstance(e, dict) and "folderUri" in e]
+        return [f for f in folders if f]
+
+    def recent_ranks(self) -> dict[str, int]:
+        """Get the position of each recently opened folder (keyed by Workspace.normalize_path)"""
+        ranks: dict[str, int] = {}
+        for rank, folder in enumerate(self.recent_folders()):
+            ranks.setdefault(Workspace.normalize_path(folder), rank)
+        return ranks
+
+    @classmethod
+    def read_items(cls, db_file: str, keys: list[str]) -> dict[str, str]:
+        """Read several keys from a VS Code state database with one read-only connection and one query"""
+        if not keys or not path.isfile(db_file):
+            return {}
+        # Read-only with a short busy timeout, so a running VS Code is never blocked (and never blocks us for long)
+        uri = f"{Path(db_file).absolute().as_uri()}?mode=ro"
+        try:
+            connection = sqlite3.connect(uri, uri=True, timeout=0.25)
+            try:
+                rows = connection.execute(
+                    f"SELECT key, value FROM ItemTable WHERE key IN ({', '.join('?' * len(keys))})", keys).fetchall()
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return {}
+        return {key: value.decode("utf-8") if isinstance(value, bytes) else value for key, value in rows}
+
+    @classmethod
+    def _read_storage_json(cls, *storage_files: str) -> dict[str, any]:
+        """Get the recently opened list from the first storage.json file that has one"""
+        for storage_file in storage_files:
+            if path.isfile(storage_file):
+                try:
+                    recent = json.loads(Path(storage_file).read_text(encoding="utf-8")).get("openedPathsList")
+                except ValueError:
+                    continue
+                if isinstance(recent, dict):
+                    return recent
+        return {}
+    #endregion
+#endregion
+
+#region WorkspaceDetails
+@dataclass
+class WorkspaceDetails:
+    """Details about a workspace that are too slow to gather while loading every workspace"""
+
+    #region Attributes
+    branch:      str=None       # Current git branch (or short commit hash if detached)
+    dirty:       bool=None      # True if tracked files have uncommitted changes
+    last_commit: float=None     # Timestamp of the latest commit
+    last_opened: float=None     # Timestamp of the last time VS Code used the workspace
+    size:        int=None       # Total size of the workspace files in bytes
+    size_exact:  bool=True      # False if the size calculation stopped at the file limit
+    git_time:    float=None     # Monotonic time when the git details (and last opened time) were read
+    size_time:   float=None     # Monotonic time when the size was calculated
+    #endregion
+
+    # Maximum number of files counted when calculating the size of a workspace
+    max_files: ClassVar[int] = 200_000
+
+    #region Properties
+    @property
+    def summary(self) -> str:
+        """Details text for presentation to the user"""
+        lines = []
+        if self.branch:
+            dirty = "" if self.dirty is None else " (uncommitted changes)" if self.dirty else " (clean)"
+            lines.append(f"Branch:      {self.branch}{dirty}")
+        if self.last_commit:
+            lines.append(f"Last commit: {WorkspaceDetails.format_time(self.last_commit)}")
+        if self.last_opened:
+            lines.append(f"Last opened: {WorkspaceDetails.format_time(self.last_opened)}")
+        size = "calculating..." if self.size is None else f"{'' if self.size_exact else 'over '}{WorkspaceDetails.format_size(self.size)}"
+        lines.append(f"Size:        {size}")
+        return "\n".join(lines)
+    #endregion
+
+    #region Helper Functions
+    def load_git(self, workspace: Workspace) -> None:
+        """Read the branch, dirty state, last commit time and last opened time"""
+        git_folder = Workspace.find_git_folder(workspace.workspace) if workspace.exists else None
+        if git_folder and path.isfile(path.join(git_folder, "HEAD")):
+            head = Path(git_folder, "HEAD").read_text(encoding="utf-8", errors="replace").strip()
+            self.branch = head[16:] if head.startswith("ref: refs/heads/") else head[:8]
+            status = WorkspaceDetails._run_git(workspace.workspace, "status", "--porcelain", "--untracked-files=no")
+            self.dirty = None if status is None else bool(status)
+            last_commit = WorkspaceDetails._run_git(workspace.workspace, "log", "-1", "--format=%ct")
+            self.last_commit = float(last_commit) if last_commit else None
+        # The locator reads the last opened time along with the workspace storage folder
+        self.last_opened = workspace.last_opened
+        self.git_time = time.monotonic()
+
+    def load_size(self, workspace: Workspace, cancelled: threading.Event=None) -> None:
+        """Calculate the size of the workspace files (stops counting at max_files)"""
+        size, files, folders = 0, 0, [workspace.workspace] if workspace.exists else []
+        while folders and files < WorkspaceDetails.max_files and not (cancelled and cancelled.is_set()):
+            try:
+                with scandir(folders.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            size += entry.stat(follow_symlinks=False).st_size
+                            files += 1
+            except OSError:
+                # Skip folders that can't be read
+                continue
+        self.size, self.size_exact = size, not folders
+        self.size_time = time.monotonic()
+
+    @classmethod
+    def format_time(cls, timestamp: float) -> str:
+        """Format a timestamp for display"""
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+    @classmethod
+    def format_size(cls, size: int) -> str:
+        """Format a size in bytes for display"""
+        for unit in ("bytes", "KB", "MB", "GB"):
+            if size < 1024 or unit == "GB":
+                return f"{size:.0f} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+            size /= 1024
+
+    @classmethod
+    def _run_git(cls, workspace_folder: str, *args: str) -> str:
+        """Run a git command in the workspace folder (returns None if git isn't available or the command fails)"""
+        if not shutil.which("git"):
+            return None
+        try:
+            result = subprocess.run(["git", "-C", workspace_folder, *args], capture_output=True, text=True, timeout=30,
+                                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return result.stdout.strip() if result.returncode == 0 else None
+    #endregion
+#endregion
+
+#region WorkspaceDetailsCache
+class WorkspaceDetailsCache:
+    """Gathers WorkspaceDetails on background threads and keeps them until they expire"""
+
+    #region Constructor
+    def __init__(self, on_ready: Callable[[Workspace, WorkspaceDetails], None], git_ttl: float=30.0, size_ttl: float=600.0) -> None:
+        """Initialize"""
+        self._on_ready = on_ready
+        self._git_ttl = git_ttl
+        self._size_ttl = size_ttl
+        self._details: dict[str, WorkspaceDetails] = {}
+        self._pending: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._pool = DaemonThreadPool(max_workers=4, thread_name_prefix="details")
+    #endregion
+
+    #region Helper Functions
+    def get(self, workspace: Workspace) -> WorkspaceDetails:
+        """Get the cached details for a workspace right away, refreshing any expired details in the background"""
+        key = Workspace.normalize_path(workspace.workspace)
+        now = time.monotonic()
+        with self._lock:
+            details = self._details.setdefault(key, WorkspaceDetails())
+            if details.git_time is None or now - details.git_time > self._git_ttl:
+                self._submit(key, "git", workspace, details)
+            if details.size_time is None or now - details.size_time > self._size_ttl:
+                self._submit(key, "size", workspace, details)
+        return details
+
+    def close(self) -> None:
+        """Stop gathering details (running size calculations are abandoned)"""
+        self._cancelled.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, key: str, kind: str, workspace: Workspace, details: WorkspaceDetails) -> None:
+        """Start a background job unless the same job is already running"""
+        if (key, kind) in self._pending or self._cancelled.is_set():
+            return
+        self._pending.add((key, kind))
+        self._pool.submit(self._load, key, kind, workspace, details)
+
+    def _load(self, key: str, kind: str, workspace: Workspace, details: WorkspaceDetails) -> None:
+        """Gather one kind of details and report them"""
+        try:
+            if kind == "git":
+                details.load_git(workspace)
+            else:
+                details.load_size(workspace, self._cancelled)
+        except OSError:
+            # Keep the details gathered so far and try again once they expire
+            if kind == "git":
+                details.git_time = time.monotonic()
+            else:
+                details.size_time = time.monotonic()
+        finally:
+            with self._lock:
+                self._pending.discard((key, kind))
+        if not self._cancelled.is_set():
+            self._on_ready(workspace, details)
+    #endregion
+#endregion
+
+#region WorkspacePrefetcher
+class WorkspacePrefetcher:
+    """Reads the source files of a selected workspace into the operating system's file cache on a background thread
+
+    VS Code reads every file of a workspace when it first indexes and searches it, so reading them ahead while
+      VS Code is still starting means those reads come from memory instead of the disk.
+    """
+
+    # Size of the reads used where the operating system can't be asked to read ahead (posix_fadvise)
+    chunk_size: ClassVar[int] = 1024 * 1024
+
+    #region Constructor
+    def __init__(self, settings: WorkspaceSettings, settings_file: str=None) -> None:
+        """Initialize (settings_file is passed on to a 'detach'ed prefetch)"""
+        self._settings = settings
+        self._settings_file = settings_file
+        self._cancelled = threading.Event()
+        self._folder: str = None
+    #endregion
+
+    #region Helper Functions
+    def start(self, workspace: Workspace) -> None:
+        """Start prefetching a workspace, abandoning the prefetch of any other workspace"""
+        if not workspace or not workspace.exists:
+            return
+        key = Workspace.normalize_path(workspace.workspace)
+        if key == self._folder:
+            # Already prefetching (or prefetched) this workspace
+            return
+        self.stop()
+        self._cancelled = threading.Event()
+        self._folder = key
+        threading.Thread(target=self.prefetch, args=(workspace.workspace, self._cancelled), daemon=True, name="prefetch").start()
+
+    def stop(self) -> None:
+        """Abandon the running prefetch (if any)"""
+        self._cancelled.set()
+        self._folder = None
+
+    def detach(self, workspace: Workspace) -> None:
+        """Hand the prefetch of a workspace over to a separate process (--prefetch), so it carries on after the launcher exits"""
+        if not workspace or not workspace.exists:
+            return
+        self.stop()
+        # A frozen (PyInstaller) launcher is its own interpreter
+        program = [sys.executable] if getattr(sys, "frozen", False) else [sys.executable, path.abspath(__file__)]
+        settings = [self._settings_file] if self._settings_file else []
+        try:
+            subprocess.Popen([*program, *settings, "--prefetch", workspace.workspace], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, start_new_session=True,
+                             creationflags=getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0))
+        except OSError:
+            # VS Code simply reads the files from the disk
+            pass
+
+    def prefetch(self, folder: str, cancelled: threading.Event=None) -> int:
+        """Read ahead the source files of a folder within prefetch_max_mb, skipping files over prefetch_file_mb
+
+        Reads are spread out to at most prefetch_mb_per_second, so they never crowd out VS Code's own reads.
+          Returns the number of bytes read ahead.
+        """
+        limit, file_limit = self._settings.prefetch_max_mb * 1024 * 1024, self._settings.prefetch_file_mb * 1024 * 1024
+        rate = self._settings.prefetch_mb_per_second * 1024 * 1024
+        started, total = time.monotonic(), 0
+        for file in self.source_files(folder):
+            if cancelled and cancelled.is_set():
+                break
+            try:
+                size = os.stat(file).st_size
+                if not 0 < size <= file_limit:
+                    continue
+                if total + size > limit:
+                    break
+                WorkspacePrefetcher.read_ahead(file, size)
+            except OSError:
+                continue
+            total += size
+            delay = total / rate - (time.monotonic() - started)
+            if delay > 0 and cancelled:
+                cancelled.wait(delay)
+            elif delay > 0:
+                time.sleep(delay)
+        return total
+
+    def source_files(self, folder: str) -> Iterator[str]:
+        """Files worth prefetching: those tracked by git, or every file outside the source_skip folders without git"""
+        tracked = WorkspaceDetails._run_git(folder, "ls-files", "-z") if Workspace.find_git_folder(folder) else None
+        if tracked is not None:
+            # Ignored files (build output, dependencies, etc.) are never tracked
+            yield from (path.join(folder, file) for file in tracked.split("\0") if file)
+            return
+        skip = set(self._settings.source_skip) | {".git"}
+        folders = [folder]
+        while folders:
+            try:
+                with scandir(folders.pop()) as entries:
+                    entries = list(entries)
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip:
+                            folders.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path
+                except OSError:
+                    continue
+
+    @classmethod
+    def read_ahead(cls, file: str, size: int) -> None:
+        """Get a file into the operating system's file cache"""
+        with open(file, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                # The kernel reads the file in the background without copying it into the process
+                os.posix_fadvise(f.fileno(), 0, size, os.POSIX_FADV_WILLNEED)
+                return
+            buffer = bytearray(WorkspacePrefetcher.chunk_size)
+            while f.readinto(buffer) == len(buffer):
+                pass
+    #endregion
+#endregion
+
+#region WorkspaceWeight
+@dataclass
+class WorkspaceWeight:
+    """Number of files and bytes in each top-level folder of a workspace, as sampled by WorkspaceWeightAnalyzer"""
+
+    #region Attributes
+    folders: dict[str, dict[str, any]]=field(default_factory=dict)
+                            # {top-level folder name: {"files", "size", "exact" (False if counting stopped early), "ignored" (git-ignored or in source_skip)}}
+    analyzed: float=None    # Timestamp of the analysis
+    #endregion
+
+    # Name under which the files directly in the workspace folder are counted
+    root: ClassVar[str] = "."
+
+    #region Properties
+    @property
+    def files(self) -> int:
+        """Number of files found"""
+        return sum(folder["files"] for folder in self.folders.values())
+
+    @property
+    def size(self) -> int:
+        """Number of bytes found"""
+        return sum(folder["size"] for folder in self.folders.values())
+
+    @property
+    def exact(self) -> bool:
+        """False if counting stopped early in any folder (so the workspace holds even more)"""
+        return all(folder["exact"] for folder in self.folders.values())
+    #endregion
+
+    #region Helper Functions
+    def level(self, heavy_files: int) -> str:
+        """Weight class: "light", "heavy" (at least heavy_files files) or "huge" (at least ten times as many)"""
+        return "huge" if self.files >= heavy_files * 10 else "heavy" if self.files >= heavy_files else "light"
+
+    def marker(self, heavy_files: int) -> str:
+        """Text appended to the name of a heavy or huge workspace in the list ("" for a light one)"""
+        level = self.level(heavy_files)
+        return "" if level == "light" else f"  [{level}: {self.files:,}{'' if self.exact else '+'} files]"
+
+    def heaviest(self, count: int=3) -> list[str]:
+        """Names of the top-level folders with the most files, most first"""
+        return sorted((name for name in self.folders if name != WorkspaceWeight.root), key=lambda name: -self.folders[name]["files"])[:count]
+
+    def summary(self, heavy_files: int) -> str:
+        """Weight text shown with the details of the workspace"""
+        heaviest = ", ".join(f"{name} {self.folders[name]['files']:,}" for name in self.heaviest() if self.folders[name]["files"])
+        return f"Weight:      {self.level(heavy_files)} ({self.files:,}{'' if self.exact else '+'} files{'; ' if heaviest else ''}{heaviest})"
+
+    def suggest_excludes(self, min_files: int) -> dict[str, dict[str, bool]]:
+        """Suggested VS Code settings keeping the ignored top-level folders with at least min_files files out of the file watcher and search
+
+        Folders that are part of the source (not ignored) are never suggested, since excluding them would hide source files
+        """
+        patterns = {f"{name}/**": True for name in self.heaviest(len(self.folders))
+                    if self.folders[name]["ignored"] and self.folders[name]["files"] >= min_files}
+        return {"files.watcherExclude": patterns, "search.exclude": dict(patterns)} if patterns else {}
+    #endregion
+#endregion
+
+#region WorkspaceWeightAnalyzer
+class WorkspaceWeightAnalyzer:
+    """Samples the files of each top-level folder of a workspace concurrently and keeps the weights (weights.json in data_path)"""
+
+    # Maximum number of files counted in each top-level folder (a folder holding more counts as "at least")
+    max_files: ClassVar[int] = 100_000
+
+    #region Constructor
+    def __init__(self, settings: WorkspaceSettings) -> None:
+        """Initialize (the stored weights are read on first use)"""
+        self._settings = settings
+        self._store = WorkspaceStore(settings.data_path)
+        self._weights: dict[str, WorkspaceWeight] = None
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._pool = DaemonThreadPool(max_workers=1, thread_name_prefix="weight")
+    #endregion
+
+    #region Helper Functions
+    def get(self, folder: str) -> WorkspaceWeight:
+        """Get the weight of a workspace folder (None if it was never analyzed)"""
+        return self._load().get(Workspace.normalize_path(folder))
+
+    def marker(self, folder: str) -> str:
+        """Text appended to the name of a workspace in the list ("" unless it was analyzed as heavy or huge)"""
+        weight = self.get(folder)
+        return weight.marker(self._settings.weight_heavy_files) if weight else ""
+
+    def stale(self, workspace: Workspace) -> bool:
+        """True if the workspace was never analyzed or its weight is older than weight_ttl days"""
+        weight = self.get(workspace.workspace)
+        return weight is None or time.time() - weight.analyzed > self._settings.weight_ttl * 86400
+
+    def analyze_later(self, workspace: Workspace, on_ready: Callable[[Workspace, WorkspaceWeight], None]) -> None:
+        """Analyze a workspace in the background if its weight is missing or stale (on_ready is called with the new weight)"""
+        if not workspace.exists or not self.stale(workspace):
+            return
+        key = Workspace.normalize_path(workspace.workspace)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+
+        def run() -> None:
+            try:
+                weight = self.analyze([workspace]).get(workspace.workspace)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+            on_ready(workspace, weight)
+
+        self._pool.submit(run)
+
+    def close(self) -> None:
+        """Stop analyzing in the background (a running analysis finishes on its own)"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def analyze(self, workspaces: Iterable[Workspace]) -> dict[str, WorkspaceWeight]:
+        """Sample the weight of each existing workspace, store the results and return them keyed by workspace folder"""
+        weights = {w.workspace: self.sample(w.workspace) for w in workspaces if w.exists}
+        records = {Workspace.normalize_path(folder): weight for folder, weight in weights.items()}
+        self._load().update(records)
+        try:
+            self._store.update("weights", lambda stored: {**stored, **{key: asdict(weight) for key, weight in records.items()}}, {})
+        except OSError:
+            # The weights are still used until the launcher closes
+            pass
+        return weights
+
+    def sample(self, folder: str) -> WorkspaceWeight:
+        """Count the files and bytes of each top-level folder of a workspace, at most max_concurrency folders at once"""
+        files, size, names = 0, 0, []
+        try:
+            with scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        # VS Code never watches or searches the git folder
+                        if entry.name != ".git":
+                            names.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        files, size = files + 1, size + entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+        folders = {WorkspaceWeight.root: {"files": files, "size": size, "exact": True, "ignored": False}}
+        if names:
+            ignored = self._ignored(folder, names)
+            with ThreadPoolExecutor(max_workers=min(len(names), self._settings.max_concurrency), thread_name_prefix="weight") as pool:
+                for name, (files, size, exact) in zip(names, pool.map(WorkspaceWeightAnalyzer._count, (path.join(folder, n) for n in names))):
+                    folders[name] = {"files": files, "size": size, "exact": exact, "ignored": name in ignored}
+        return WorkspaceWeight(folders, time.time())
+
+    def _load(self) -> dict[str, WorkspaceWeight]:
+        """Get the weights, reading the stored weights the first time"""
+        with self._lock:
+            if self._weights is None:
+                self._weights = {}
+                for key, record in self._store.load("weights", {}).items():
+                    try:
+                        self._weights[key] = WorkspaceWeight(**record)
+                    except TypeError:
+                        continue
+            return self._weights
+
+    def _ignored(self, folder: str, names: list[str]) -> set[str]:
+        """Get the top-level folders that are git-ignored or named in source_skip"""
+        ignored = {name for name in names if name in self._settings.source_skip}
+        if Workspace.find_git_folder(folder):
+            output = WorkspaceDetails._run_git(folder, "check-ignore", *names)
+            ignored.update(output.splitlines() if output else [])
+        return ignored
+
+    @classmethod
+    def _count(cls, folder: str) -> tuple[int, int, bool]:
+        """Count the files and bytes in a folder, stopping at max_files files (returns files, bytes and whether the count is complete)"""
+        files, size, folders = 0, 0, [folder]
+        while folders and files < WorkspaceWeightAnalyzer.max_files:
+            try:
+                with scandir(folders.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            files, size = files + 1, size + entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+        return files, size, not folders
+    #endregion
+#endregion
+
+#region WorkspaceStore
+class WorkspaceStore:
+    """JSON files the launcher keeps between runs (in the data_path folder)
+
+    Several launchers may use the same files at once. Writers take an exclusive lock on a '.lock' file next to
+      the data and replace the data file in one step, so readers never need the lock and never see a partial
+      file. Each file records the version of its layout, and older layouts are upgraded when they are read.
+    """
+
+    # Current layout version of each stored file (files written before versions were recorded are version 0)
+    versions: ClassVar[dict[str, int]] = {"orphans": 1, "source_folders": 1, "weights": 1}
+    # Upgrades from one version to the next: {(name, version): function returning the data in the next version's layout}
+    migrations: ClassVar[dict[tuple[str, int], Callable[[any], any]]] = {
+        # Version 1 only added the version envelope around the same data
+        ("orphans", 0): lambda data: data,
+        ("source_folders", 0): lambda data: data
+    }
+    # Seconds a writer waits for the lock (and for readers to let go of the file on Windows)
+    lock_timeout: ClassVar[float] = 2.0
+    # Attempts a reader makes while a writer is replacing the file on Windows (a few milliseconds in total)
+    read_attempts: ClassVar[int] = 5
+
+    #region Constructor
+    def __init__(self, data_path: str) -> None:
+        """Initialize"""
+        self.data_path = data_path
+    #endregion
+
+    #region Helper Functions
+    def file(self, name: str) -> str:
+        """Path to a stored JSON file"""
+        return path.join(self.data_path, f"{name}.json")
+
+    def load(self, name: str, default: any=None) -> any:
+        """Read a stored value in the current layout (the default if it was never saved, can't be read or is from a newer version)"""
+        for _ in range(WorkspaceStore.read_attempts):
+            try:
+                document = json.loads(Path(self.file(name)).read_text(encoding="utf-8"))
+                break
+            except PermissionError:
+                # Windows refuses to open a file while it is being replaced
+                time.sleep(0.002)
+            except (OSError, ValueError):
+                return default
+        else:
+            return default
+        return WorkspaceStore._migrate(name, document, default)
+
+    def save(self, name: str, data: any) -> None:
+        """Write a stored value under the write lock (raises OSError, e.g. TimeoutError if the lock can't be taken)"""
+        with self.lock(name):
+            self._write(name, data)
+
+    def update(self, name: str, change: Callable[[any], any], default: any=None) -> any:
+        """Read, change and write a stored value under the write lock, so launchers never lose each other's changes
+
+        Returns the changed value (raises OSError like 'save')
+        """
+        with self.lock(name):
+            data = change(self.load(name, default))
+            self._write(name, data)
+            return data
+
+    @contextmanager
+    def lock(self, name: str, timeout: float=None) -> Iterator[None]:
+        """Hold the exclusive write lock of a stored file (raises TimeoutError if it isn't free within the timeout)"""
+        os.makedirs(self.data_path, exist_ok=True)
+        deadline = time.monotonic() + (WorkspaceStore.lock_timeout if timeout is None else timeout)
+        with open(path.join(self.data_path, f"{name}.lock"), "a+b") as lock_file:
+            while not WorkspaceStore._try_lock(lock_file):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"{name} is locked by another launcher")
+                time.sleep(0.01)
+            try:
+                yield
+            finally:
+                WorkspaceStore._unlock(lock_file)
+
+    def _write(self, name: str, data: any) -> None:
+        """Write a stored value to a temporary file and replace the stored file with it (call with the lock held)"""
+        target = self.file(name)
+        temp_file = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"version": WorkspaceStore.versions.get(name, 1), "data": data}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        deadline = time.monotonic() + WorkspaceStore.lock_timeout
+        while True:
+            try:
+                os.replace(temp_file, target)
+                return
+            except PermissionError:
+                # On Windows a reader still has the file open for a moment
+                if time.monotonic() >= deadline:
+                    os.remove(temp_file)
+                    raise
+                time.sleep(0.005)
+
+    @classmethod
+    def _migrate(cls, name: str, document: any, default: any) -> any:
+        """Get the data of a stored document in the current layout (the default if it can't be upgraded)"""
+        if isinstance(document, dict) and set(document) == {"version", "data"}:
+            version, data = document["version"], document["data"]
+        else:
+            version, data = 0, document
+        current = WorkspaceStore.versions.get(name, 1)
+        if not isinstance(version, int) or version > current:
+            # Written by a newer launcher
+            return default
+        while version < current:
+            migrate = WorkspaceStore.migrations.get((name, version))
+            if migrate is None:
+                return default
+            data, version = migrate(data), version + 1
+        return data
+
+    @classmethod
+    def _try_lock(cls, lock_file: BinaryIO) -> bool:
+        """Try to take an exclusive lock on an open lock file without waiting"""
+        try:
+            if msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            elif fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    @classmethod
+    def _unlock(cls, lock_file: BinaryIO) -> None:
+        """Release the lock on an open lock file"""
+        if msvcrt:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        elif fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    #endregion
 #endregion
 
-#region WorkspaceLocator
-class WorkspaceLocator:
-    """Locator for VS Code Workspaces on PC"""
+#region WorkspaceSnapshot
+class WorkspaceSnapshot(Sequence):
+    """Read-only, memory-mapped list of workspaces saved by an earlier scan
+
+    The file holds one column per workspace attribute: string columns are an array of offsets followed by
+      the UTF-8 text, and flag and number columns are plain arrays. Workspace objects are only created for
+      the rows that are actually used.
+    """
+
+    # File signature (changes whenever the columns change)
+    magic: ClassVar[bytes] = b"WSSNAP03"
+    # Header: signature, row count, settings fingerprint, workspace storage folder modification time
+    _header: ClassVar[struct.Struct] = struct.Struct("<8sIId")
+    _string_columns: ClassVar[tuple[str, ...]] = ("vsc_folder", "workspace", "name", "parent", "repo_uri", "source", "repo_host", "display_name")
+    # Fixed size columns: (name, array type code)
+    _fixed_columns: ClassVar[tuple[tuple[str, str], ...]] = (("flags", "B"), ("last_opened", "d"), ("recent_rank", "i"))
+    # Bits of the flags column
+    _EXISTS, _HAS_VSC_FOLDER, _HAS_REPO, _SHOW_REPO, _SHOW_GLYPH = 1, 2, 4, 8, 16
+
+    #region Constructor
+    def __init__(self, buffer: mmap.mmap, columns: dict[str, memoryview], rows: range | list[int], cache: dict[int, Workspace]) -> None:
+        """Initialize a view of some of the rows of a loaded snapshot (use the 'load' factory)"""
+        self._buffer = buffer
+        self._columns = columns
+        self._rows = rows
+        self._cache = cache
+    #endregion
+
+    #region Sequence
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index: int | slice) -> Workspace | list[Workspace]:
+        if isinstance(index, slice):
+            return [self.workspace(row) for row in self._rows[index]]
+        return self.workspace(self._rows[index])
+
+    def __contains__(self, workspace: object) -> bool:
+        # Only workspaces created by the snapshot can be in it
+        return any(self._cache.get(row) is workspace for row in self._rows)
+    #endregion
+
+    #region Static Factory Methods
+    @classmethod
+    def load(cls, snapshot_file: str, fingerprint: int, storage_mtime: float) -> "WorkspaceSnapshot":
+        """Factory: Map a snapshot file (None if it is missing, damaged or out of date)"""
+        try:
+            with open(snapshot_file, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        columns: dict[str, memoryview] = {}
+        try:
+            magic, row_count, file_fingerprint, file_mtime = cls._header.unpack_from(buffer)
+            if magic != cls.magic or file_fingerprint != fingerprint or file_mtime != storage_mtime:
+                buffer.close()
+                return None
+            offset = cls._header.size
+            view = columns[""] = memoryview(buffer)
+            for name in cls._string_columns:
+                offset = cls._align(offset)
+                offsets = view[offset:offset + 4 * (row_count + 1)].cast("I")
+                columns[name] = offsets
+                columns[f"{name}_text"] = view[offset + 4 * (row_count + 1):offset + 4 * (row_count + 1) + offsets[-1]]
+                offset += 4 * (row_count + 1) + offsets[-1]
+            for name, code in cls._fixed_columns:
+                offset = cls._align(offset, 8)
+                size = struct.calcsize(code) * row_count
+                columns[name] = view[offset:offset + size].cast(code)
+                offset += size
+        except (struct.error, ValueError, TypeError, IndexError):
+            WorkspaceSnapshot._unmap(buffer, columns)
+            return None
+        return cls(buffer, columns, range(row_count), {})
+    #endregion
+
+    #region Helper Functions
+    def workspace(self, row: int) -> Workspace:
+        """Get the Workspace for a row (created on first use)"""
+        workspace = self._cache.get(row)
+        if workspace is None:
+            flags = self._columns["flags"][row]
+            last_opened = self._columns["last_opened"][row]
+            recent_rank = self._columns["recent_rank"][row]
+            workspace = Workspace(
+                self.text("vsc_folder", row) if flags & self._HAS_VSC_FOLDER else None,
+                self.text("workspace", row),
+                self.text("name", row),
+                self.text("parent", row),
+                self.text("repo_uri", row) if flags & self._HAS_REPO else None,
+                bool(flags & self._EXISTS),
+                bool(flags & self._SHOW_REPO),
+                bool(flags & self._SHOW_GLYPH),
+                None if last_opened != last_opened else last_opened,
+                None if recent_rank < 0 else recent_rank,
+                self.text("source", row),
+                self.text("repo_host", row) if flags & self._HAS_REPO else None)
+            self._cache[row] = workspace
+        return workspace
+
+    def text(self, column: str, row: int) -> str:
+        """Read one value of a string column without creating a Workspace"""
+        offsets = self._columns[column]
+        return bytes(self._columns[f"{column}_text"][offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def display_names(self) -> list[str]:
+        """Get the display names of the rows in the view"""
+        return self.values("display_name")
+
+    def values(self, column: str) -> list[str]:
+        """Get the values of a string column for the rows in the view without creating Workspaces"""
+        return [self.text(column, row) for row in self._rows]
+
+    def exists(self) -> list[bool]:
+        """Get whether the workspace folder of each row in the view existed when the snapshot was saved"""
+        flags = self._columns["flags"]
+        return [bool(flags[row] & self._EXISTS) for row in self._rows]
+
+    def select(self, positions: list[int]) -> "WorkspaceSnapshot":
+        """Get a view of the rows at some positions of this view"""
+        return self.view([self._rows[position] for position in positions])
+
+    def existing(self) -> "WorkspaceSnapshot":
+        """Get a view of the rows whose workspace folder existed when the snapshot was saved"""
+        flags = self._columns["flags"]
+        return self.view([row for row in self._rows if flags[row] & self._EXISTS])
+
+    def view(self, rows: list[int]) -> "WorkspaceSnapshot":
+        """Get a view of some rows of the snapshot (sharing the mapped file and created Workspaces)"""
+        return WorkspaceSnapshot(self._buffer, self._columns, rows, self._cache)
+
+    @classmethod
+    def save(cls, snapshot_file: str, workspaces: list[Workspace], fingerprint: int, storage_mtime: float) -> None:
+        """Write the workspaces to a snapshot file (replaces the file in one step)"""
+        data = bytearray(cls._header.pack(cls.magic, len(workspaces), fingerprint, storage_mtime))
+        for name in cls._string_columns:
+            data.extend(bytes(cls._align(len(data)) - len(data)))
+            encoded = [(getattr(w, name) or "").encode("utf-8") for w in workspaces]
+            offsets = array("I", [0])
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            data.extend(offsets.tobytes())
+            data.extend(b"".join(encoded))
+        flags = [(cls._EXISTS if w.exists else 0) | (cls._HAS_VSC_FOLDER if w.vsc_folder else 0) | (cls._HAS_REPO if w.repo_uri else 0)
+                 | (cls._SHOW_REPO if w.show_repo else 0) | (cls._SHOW_GLYPH if w.show_glyph else 0) for w in workspaces]
+        values = {
+            "flags": flags,
+            "last_opened": [float("nan") if w.last_opened is None else w.last_opened for w in workspaces],
+            "recent_rank": [-1 if w.recent_rank is None else w.recent_rank for w in workspaces]
+        }
+        for name, code in cls._fixed_columns:
+            data.extend(bytes(cls._align(len(data), 8) - len(data)))
+            data.extend(array(code, values[name]).tobytes())
+        os.makedirs(path.dirname(snapshot_file), exist_ok=True)
+        temp_file = f"{snapshot_file}.{os.getpid()}.tmp"
+        try:
+            Path(temp_file).write_bytes(data)
+            os.replace(temp_file, snapshot_file)
+        except OSError:
+            # On Windows the old snapshot can't be replaced while another launcher has it mapped
+            if path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+    def close(self) -> None:
+        """Unmap the snapshot file (Workspaces already created remain usable)"""
+        WorkspaceSnapshot._unmap(self._buffer, self._columns)
+
+    @classmethod
+    def _unmap(cls, buffer: mmap.mmap, columns: dict[str, memoryview]) -> None:
+        """Release the column views (the whole file view, stored under "", goes last) and unmap the file"""
+        for name in sorted(columns, reverse=True):
+            columns[name].release()
+        buffer.close()
+
+    @classmethod
+    def fingerprint(cls, settings: WorkspaceSettings) -> int:
+        """Get a number identifying the settings that change the saved workspaces"""
+        return zlib.crc32(json.dumps([settings.workspace_path, settings.show_repos, settings.show_glyphs, settings.sort_by,
+                                       settings.repo_hosts, settings.source_roots, settings.source_depth, settings.source_skip,
+                                       settings.providers]).encode("utf-8"))
+
+    @classmethod
+    def _align(cls, offset: int, size: int=4) -> int:
+        """Round an offset up to a multiple of the column value size"""
+        return (offset + size - 1) // size * size
+    #endregion
+#endregion
+
+#region WorkspaceIndex
+class WorkspaceIndex:
+    """Inverted indexes of the workspace fields for the filter box query language
+
+    A query is a list of terms, all of which must match: plain words search the display name, 'field:value' terms
+      search one field (name, parent, repo, host, source, path or missing:true/false), and a leading '-' excludes
+      the matches of a term. Each term is answered from the index of its field, looking through the distinct words
+      of the field instead of through every workspace.
+    """
+
+    # Query fields: {field: workspace attribute (or snapshot column)}, "" being the display name
+    fields: ClassVar[dict[str, str]] = {"": "display_name", "name": "name", "parent": "parent", "repo": "repo_uri", "host": "repo_host",
+                                        "source": "source", "path": "workspace"}
+    _words: ClassVar[re.Pattern] = re.compile(r"\w+")
+
+    #region Constructor
+    def __init__(self, workspaces: Sequence[Workspace], fields: dict[str, str]=None) -> None:
+        """Build the indexes of the workspaces (snapshot rows are indexed from the snapshot columns)"""
+        self.workspaces = workspaces
+        self.fields = WorkspaceIndex.fields if fields is None else fields
+        self._all = set(range(len(workspaces)))
+        self._indexes: dict[str, dict[str, set[int]]] = {}
+        for name, attribute in self.fields.items():
+            if isinstance(workspaces, WorkspaceSnapshot):
+                values = workspaces.values(attribute)
+            else:
+                values = [getattr(w, attribute) for w in workspaces]
+            index: dict[str, set[int]] = {}
+            for position, value in enumerate(values):
+                for word in WorkspaceIndex._words.findall((value or "").lower()):
+                    index.setdefault(word, set()).add(position)
+            self._indexes[name] = index
+        exists = workspaces.exists() if isinstance(workspaces, WorkspaceSnapshot) else [w.exists for w in workspaces]
+        self._missing = {position for position, exist in enumerate(exists) if not exist}
+    #endregion
+
+    #region Helper Functions
+    def search(self, query: str) -> list[int]:
+        """Get the positions of the workspaces matching every term of a query, in list order"""
+        matches = set(self._all)
+        for term in WorkspaceIndex.terms(query):
+            exclude = term.startswith("-") and len(term) > 1
+            if exclude:
+                term = term[1:]
+            field, _, value = term.partition(":")
+            if not value or field.lower() not in self.fields and field.lower() != "missing":
+                # Not a field query (e.g. a drive letter), so the whole term is searched in the display name
+                field, value = "", term
+            positions = self._match(field.lower(), value.lower())
+            matches = matches - positions if exclude else matches & positions
+        return sorted(matches)
+
+    def _match(self, field: str, value: str) -> set[int]:
+        """Get the positions whose field contains every word of the value"""
+        if field == "missing":
+            return self._missing if value in ("true", "yes", "1") else self._all - self._missing
+        index = self._indexes[field]
+        positions = set(self._all)
+        for word in WorkspaceIndex._words.findall(value):
+            positions &= set().union(*(found for key, found in index.items() if word in key))
+        return positions
+
+    @classmethod
+    def terms(cls, query: str) -> list[str]:
+        """Split a query into terms ("quoted text" stays one term)"""
+        try:
+            return shlex.split(query)
+        except ValueError:
+            # Unbalanced quotes while the user is still typing
+            return query.split()
+    #endregion
+#endregion
+
+#region WorkspaceRefreshScheduler
+class WorkspaceRefreshScheduler:
+    """Keeps a locator's workspaces up to date in the background
+
+    Workspaces used recently (or that just changed) are checked often and idle ones rarely. Each tick checks
+      at most refresh_budget workspaces on a single worker thread, and workspaces that are slow or unreachable
+      are checked less and less often, so refreshing never competes with the UI or VS Code for the disk.
+    """
+
+    # Seconds between ticks
+    tick_seconds: ClassVar[float] = 1.0
+    # Workspace attributes that a refresh can change
+    refreshed_fields: ClassVar[tuple[str, ...]] = ("exists", "repo_uri", "repo_host")
+
+    #region Constructor
+    def __init__(self, locator: "WorkspaceLocator", on_change: Callable[[Workspace], None]) -> None:
+        """Initialize (on_change is called with a changed workspace, or None after the whole list was reloaded)"""
+        self._locator = locator
+        self._settings = locator._settings
+        self._on_change = on_change
+        self._due: list[tuple[float, int, str]] = []            # Heap of (due time, sequence, key)
+        self._entries: dict[str, tuple[Workspace, float]] = {}  # {key: (workspace, current interval)}
+        self._sequence = 0
+        self._pool = DaemonThreadPool(max_workers=1, thread_name_prefix="refresh")
+        self._busy = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread = None
+        self._storage_mtime = self._get_storage_mtime()
+        if isinstance(locator._workspaces, WorkspaceSnapshot):
+            # Snapshot rows are read-only (the UI reads their columns), so the refresh works on Workspace objects instead
+            locator._workspaces = locator._workspaces[:]
+            locator.refreshed()
+        self.schedule_all()
+    #endregion
+
+    #region Helper Functions
+    def start(self) -> None:
+        """Start ticking on a background thread"""
+        self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop ticking (a check that is still running is abandoned)"""
+        self._stopped.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def schedule_all(self) -> None:
+        """Schedule every workspace of the locator according to how recently it was used"""
+        self._due, self._entries = [], {}
+        now = time.monotonic()
+        for workspace in self._locator._workspaces:
+            interval = self._initial_interval(workspace)
+            self._schedule(Workspace.normalize_path(workspace.workspace), workspace, interval, now + interval)
+
+    def tick(self) -> int:
+        """Check the workspaces that are due, up to the refresh budget (returns the number checked)"""
+        if self._busy and not self._busy.done():
+            # The last check is stuck on a slow path, don't pile more work behind it
+            return 0
+        if self._storage_changed():
+            # Workspaces were added to or removed from VS Code's storage, so the whole list is reloaded
+            self._busy = self._pool.submit(self._reload)
+            return 0
+        checked, now = 0, time.monotonic()
+        while self._due and self._due[0][0] <= now and checked < self._settings.refresh_budget:
+            _, _, key = heapq.heappop(self._due)
+            if key not in self._entries:
+                continue
+            checked += 1
+            workspace, interval = self._entries[key]
+            self._busy = self._pool.submit(Workspace.from_workspace_folder, workspace.workspace, workspace.vsc_folder,
+                                           workspace.show_repo, workspace.show_glyph, self._settings.repo_hosts)
+            started = time.monotonic()
+            try:
+                fresh = self._busy.result(timeout=self._settings.io_timeout)
+            except (FutureTimeoutError, OSError):
+                # Unreachable or very slow: back off hard, and stop this tick
+                self._schedule(key, workspace, min(interval * 4, self._settings.refresh_max_interval))
+                break
+            if fresh and self._update(workspace, fresh):
+                # Changed workspaces are likely to change again soon
+                self._schedule(key, workspace, self._settings.refresh_min_interval)
+                self._on_change(workspace)
+            elif time.monotonic() - started > self._settings.io_timeout / 2:
+                self._schedule(key, workspace, min(interval * 4, self._settings.refresh_max_interval))
+            else:
+                self._schedule(key, workspace, min(interval * 2, self._settings.refresh_max_interval))
+        return checked
+
+    def _run(self) -> None:
+        """Tick until stopped"""
+        while not self._stopped.wait(WorkspaceRefreshScheduler.tick_seconds):
+            try:
+                self.tick()
+            except RuntimeError:
+                # The worker pool was shut down while stopping
+                break
+
+    def _schedule(self, key: str, workspace: Workspace, interval: float, due: float=None) -> None:
+        """(Re)schedule a workspace check"""
+        self._sequence += 1
+        self._entries[key] = (workspace, interval)
+        heapq.heappush(self._due, (due if due is not None else time.monotonic() + interval, self._sequence, key))
+
+    def _initial_interval(self, workspace: Workspace) -> float:
+        """Get the first check interval: short for recently used workspaces, long for idle ones"""
+        if workspace.recent_rank is not None:
+            return self._settings.refresh_min_interval
+        if workspace.last_opened and time.time() - workspace.last_opened < 7 * 86400:
+            return min(self._settings.refresh_min_interval * 10, self._settings.refresh_max_interval)
+        return self._settings.refresh_max_interval
+
+    def _update(self, workspace: Workspace, fresh: Workspace) -> bool:
+        """Copy the refreshed attributes onto the listed workspace (returns True if anything changed)"""
+        changed = False
+        for name in WorkspaceRefreshScheduler.refreshed_fields:
+            if getattr(workspace, name) != getattr(fresh, name):
+                setattr(workspace, name, getattr(fresh, name))
+                changed = True
+        if changed:
+            self._locator.refreshed()
+        return changed
+
+    def _reload(self) -> None:
+        """Reload the whole workspace list"""
+        self._locator._workspaces = self._locator.load_workspaces()
+        self._locator.refreshed()
+        self.schedule_all()
+        self._on_change(None)
+
+    def _storage_changed(self) -> bool:
+        """Check whether VS Code's workspace storage folder changed since the last check"""
+        storage_mtime = self._get_storage_mtime()
+        changed = storage_mtime != self._storage_mtime
+        self._storage_mtime = storage_mtime
+        return changed
+
+    def _get_storage_mtime(self) -> float:
+        """Get the modification time of VS Code's workspace storage folder"""
+        try:
+            return path.getmtime(self._settings.workspace_path)
+        except OSError:
+            return None
+    #endregion
+#endregion
+
+#region DaemonThreadPool
+class DaemonThreadPool(Executor):
+    """Thread pool whose workers are daemon threads, for calls that may hang on an unreachable drive
+
+    ThreadPoolExecutor joins its workers when Python exits, even after shutdown(wait=False), so one hung call
+      would keep the program alive. The workers of this pool are abandoned instead.
+    """
+
+    #region Constructor
+    def __init__(self, max_workers: int, thread_name_prefix: str="daemon") -> None:
+        """Initialize (workers are started as calls are submitted)"""
+        self._max_workers = max(1, max_workers)
+        self._thread_name_prefix = thread_name_prefix
+        self._tasks: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads: list[threading.Thread] = []
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+        self._shutdown = False
+    #endregion
+
+    #region Helper Functions
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """Schedule a call, starting a worker if none is idle"""
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._tasks.put((future, fn, args, kwargs))
+            if not self._idle.acquire(blocking=False) and len(self._threads) < self._max_workers:
+                self._start_worker()
+        return future
+
+    def abandon(self) -> None:
+        """Start a replacement worker for one whose call was given up on, so the calls queued behind it still run"""
+        with self._lock:
+            if not self._shutdown:
+                self._max_workers += 1
+                self._start_worker()
+
+    def shutdown(self, wait: bool=True, *, cancel_futures: bool=False) -> None:
+        """Stop the workers once the queued calls are done (queued calls are cancelled if cancel_futures is true)"""
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                while True:
+                    try:
+                        future, *_ = self._tasks.get_nowait()
+                    except queue.Empty:
+                        break
+                    future.cancel()
+            for _ in self._threads:
+                self._tasks.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _start_worker(self) -> None:
+        """Start a worker thread (call with the lock held)"""
+        thread = threading.Thread(target=self._work, name=f"{self._thread_name_prefix}_{len(self._threads)}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _work(self) -> None:
+        """Run queued calls until the pool is shut down"""
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            future, fn, args, kwargs = task
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            self._idle.release()
+    #endregion
+#endregion
+
+#region WorkspaceProvider
+class WorkspaceProvider:
+    """Source of workspaces other than VS Code's workspace storage (subclasses set 'name' and implement 'read')
+
+    The folders a provider reads are cached per provider and user along with a stamp of the provider's files
+      (their modification times), so they are only read again once one of those files changes.
+    """
+
+    # Source of the workspaces found (Workspace.source) and value of the 'providers' setting
+    name: ClassVar[str] = None
+    # Folders read by each provider: {(provider name, username): (stamp, folders)}
+    _cache: ClassVar[dict[tuple[str, str], tuple[tuple, list[str]]]] = {}
+
+    #region Constructor
+    def __init__(self, settings: WorkspaceSettings) -> None:
+        """Initialize"""
+        self._settings = settings
+        self.home = path.expanduser(f"~{settings.username}")
+    #endregion
+
+    #region Helper Functions
+    def workspaces(self) -> list[Workspace]:
+        """Get the provider's workspaces (with 'source' set to the provider's name)"""
+        workspaces = []
+        for folder in self.folders():
+            workspace = Workspace.from_workspace_folder(folder, None, self._settings.show_repos, self._settings.show_glyphs,
+                                                        self._settings.repo_hosts)
+            if workspace:
+                workspace.source = self.name
+                workspaces.append(workspace)
+        return workspaces
+
+    def folders(self) -> list[str]:
+        """Get the provider's workspace folders (from the cache while the provider's files are unchanged)"""
+        key = (self.name, self._settings.username)
+        stamp = self.stamp()
+        cached = WorkspaceProvider._cache.get(key)
+        if stamp is not None and cached and cached[0] == stamp:
+            return cached[1]
+        # Solutions and project files stand for the folder containing them
+        folders = [path.dirname(folder) if path.isfile(folder) else folder for folder in self.read()]
+        WorkspaceProvider._cache[key] = (stamp, folders)
+        return folders
+
+    def stamp(self) -> tuple:
+        """Get a value that changes when the provider's files change (None to read every time)"""
+        files = self.files()
+        return tuple((file, path.getmtime(file)) for file in files) if files else None
+
+    def files(self) -> list[str]:
+        """Get the files the provider reads its folders from"""
+        return []
+
+    def read(self) -> list[str]:
+        """Read the provider's workspace folders"""
+        raise NotImplementedError
+    #endregion
+#endregion
+
+#region FolderProvider
+class FolderProvider(WorkspaceProvider):
+    """Git repositories under the source_roots folders (see WorkspaceLocator.find_repositories)"""
+
+    name: ClassVar[str] = "folder"
+
+    #region Helper Functions
+    def read(self) -> list[str]:
+        """Search the source roots (the search keeps its own cache of unchanged folders)"""
+        return WorkspaceLocator(self._settings, load=False).find_repositories()
+    #endregion
+#endregion
+
+#region JetBrainsProvider
+class JetBrainsProvider(WorkspaceProvider):
+    """Projects in the recently opened lists of JetBrains IDEs (IntelliJ IDEA, PyCharm, Rider, ...)"""
+
+    name: ClassVar[str] = "jetbrains"
+    # Files of each IDE's options folder holding its recently opened projects (Rider lists solutions)
+    recent_files: ClassVar[tuple[str, ...]] = ("recentProjects.xml", "recentSolutions.xml")
+
+    #region Helper Functions
+    def files(self) -> list[str]:
+        """Get the recently opened lists of every installed IDE version"""
+        if platform.system() == "Windows":
+            config_path = path.join(self.home, "AppData", "Roaming", "JetBrains")
+        elif platform.system() == "Darwin":
+            config_path = path.join(self.home, "Library", "Application Support", "JetBrains")
+        else:
+            config_path = path.join(self.home, ".config", "JetBrains")
+        return sorted(file for name in JetBrainsProvider.recent_files
+                      for file in glob.glob(path.join(glob.escape(config_path), "*", "options", name)))
+
+    def read(self) -> list[str]:
+        """Read the project paths (the keys of 'additionalInfo', or the 'recentPaths' list of older versions)"""
+        folders = []
+        for file in self.files():
+            try:
+                root = ElementTree.parse(file).getroot()
+            except (OSError, ElementTree.ParseError):
+                continue
+            for option in root.iter("option"):
+                if option.get("name") == "additionalInfo":
+                    folders += [entry.get("key") for entry in option.iter("entry")]
+                elif option.get("name") == "recentPaths":
+                    folders += [item.get("value") for item in option.iter("option") if item is not option]
+        return [path.normpath(folder.replace("$USER_HOME$", self.home)) for folder in folders if folder]
+    #endregion
+#endregion
+
+#region VisualStudioProvider
+class VisualStudioProvider(WorkspaceProvider):
+    """Solutions and folders in the recently opened lists of Visual Studio 2019 and later (Windows)"""
+
+    name: ClassVar[str] = "visualstudio"
+
+    #region Helper Functions
+    def files(self) -> list[str]:
+        """Get the recently opened lists (CodeContainers.json) of every installed Visual Studio instance"""
+        if platform.system() != "Windows":
+            return []
+        return sorted(file for app_data in ("Local", "Roaming")
+                      for file in glob.glob(path.join(glob.escape(path.join(self.home, "AppData", app_data, "Microsoft", "VisualStudio")),
+                                                      "*", "CodeContainers.json")))
+
+    def read(self) -> list[str]:
+        """Read the full paths of the local entries"""
+        folders = []
+        for file in self.files():
+            try:
+                entries = json.loads(Path(file).read_text(encoding="utf-8-sig"))
+            except (OSError, ValueError):
+                continue
+            if not isinstance(entries, list):
+                continue
+            for entry in entries:
+                local = (entry.get("Value") or {}).get("LocalProperties") if isinstance(entry, dict) else None
+                if isinstance(local, dict) and local.get("FullPath"):
+                    folders.append(local["FullPath"])
+        return folders
+    #endregion
+#endregion
+
+#region WorkspaceLocator
+class WorkspaceLocator:
+    """Locator for VS Code Workspaces on PC"""
+
+    # Providers of workspaces outside VS Code's workspace storage: {value of the 'providers' setting: provider class}
+    providers: ClassVar[dict[str, type[WorkspaceProvider]]] = {"folder": FolderProvider, "jetbrains": JetBrainsProvider,
+                                                               "visualstudio": VisualStudioProvider}
+    # Fields written by 'export', in column order
+    export_fields: ClassVar[tuple[str, ...]] = ("name", "parent", "workspace", "exists", "repo_uri", "repo_host", "source", "vsc_folder",
+                                                "storage_size", "last_opened", "recent_rank", "user")
+    # Suffixes of the files SQLite keeps next to a database while a connection is writing to it (or has it open in WAL mode)
+    _sqlite_lock_files: ClassVar[tuple[str, ...]] = ("-journal", "-wal", "-shm")
+
+    #region Constructor
+    def __init__(self, settings: WorkspaceSettings=None, settings_json: dict[str, any]=None, settings_file: str=None,
+                 load: bool=True) -> None:
+        """Initialize (when load is False, nothing is scanned, e.g. to stream an export with 'iter_workspaces')"""
+        self._settings = WorkspaceLocator._get_settings(settings, settings_json, settings_file)
+        self._duplicates: list[str] = []
+        self._storage_times: dict[str, float] = {}
+        self._search_keys: tuple[Sequence[Workspace], Sequence[Workspace], list[tuple[str, str]]] = (None, [], [])
+        self._group_keys: tuple[Sequence[Workspace], str, Sequence[Workspace], dict[str, list[int]]] = (None, None, [], {})
+        self._index: tuple[Sequence[Workspace], WorkspaceIndex] = (None, None)
+        self._compacted: dict[str, int] = {}
+        if not load:
+            self._workspaces: Sequence[Workspace] = []
+            return
+        snapshot = self.load_snapshot() if self._settings.use_snapshot else None
+        if snapshot is not None and self._snapshot_sources_current(snapshot):
+            # Nothing was added to or removed from the workspace storage folder or the providers since the snapshot was saved
+            self._workspaces = snapshot
+            return
+        if snapshot is not None:
+            snapshot.close()
+        self._workspaces = self.load_workspaces()
+        if self._settings.clean_up_duplicates:
+            self.clean_up_duplicates()
+        if self._settings.clean_up_orphans:
+            self.clean_up_orphans()
+        if self._settings.compact_state:
+            self.compact_later()
+        if self._settings.use_snapshot:
+            self.save_snapshot()
+    #endregion
+    
+    #region Properties
+    @property
+    def workspaces(self) -> Sequence[Workspace]:
+        if not self._settings.hide_missing:
+            return self._workspaces
+        if isinstance(self._workspaces, WorkspaceSnapshot):
+            return self._workspaces.existing()
+        return [w for w in self._workspaces if w.exists]
+
+    @property
+    def duplicates(self) -> list[str]:
+        """VS Code folders that point to a workspace folder already described by another VS Code folder"""
+        return self._duplicates
+
+    @property
+    def compacted(self) -> dict[str, int]:
+        """Bytes reclaimed per workspace folder by the last 'compact_state'"""
+        return self._compacted
+    #endregion
+
+    #region Helper Functions
+    @classmethod
+    def _get_settings(cls, settings: WorkspaceSettings, settings_json: dict[str, any], settings_file: str) -> WorkspaceSettings:
+        """Get the settings from whichever constructor argument was provided"""
+        if settings:
+            return settings
+        if settings_json:
+            return WorkspaceSettings.from_dict(settings_json)
+        return WorkspaceSettings.from_file(settings_file) if settings_file else WorkspaceSettings()
+
+    def load_workspaces(self) -> list[Workspace]:
+        """Scans the PC for VS Code workspaces"""
+        folders = self._unique_workspace_folders(
+            (vsc_folder, Workspace.read_workspace_folder(vsc_folder)) for vsc_folder in self._storage_folders())
+        workspaces = [Workspace.from_workspace_folder(ws_path, vsc_folder, self._settings.show_repos, self._settings.show_glyphs,
+                                                      self._settings.repo_hosts)
+                      for vsc_folder, ws_path in folders]
+        workspaces += self.source_workspaces({Workspace.normalize_path(ws_path) for _, ws_path in folders})
+        return self._complete_workspaces(workspaces)
+
+    def iter_workspaces(self) -> Iterator[Workspace]:
+        """Scans the PC for VS Code workspaces, yielding each one as soon as it is read
+
+        Nothing but the VS Code folder names and the workspace paths already seen (to skip duplicates) is kept, so
+          memory use does not grow with the Workspace objects. Workspaces come in storage order, newest first.
+        """
+        ranks = VSCodeState(self._settings.workspace_path).recent_ranks()
+        seen: set[str] = set()
+        self._duplicates = []
+        for vsc_folder in self._storage_folders():
+            ws_path = Workspace.read_workspace_folder(vsc_folder)
+            if ws_path is None:
+                continue
+            key = Workspace.normalize_path(ws_path)
+            if key in seen:
+                self._duplicates.append(vsc_folder)
+                continue
+            seen.add(key)
+            workspace = Workspace.from_workspace_folder(ws_path, vsc_folder, self._settings.show_repos, self._settings.show_glyphs,
+                                                        self._settings.repo_hosts)
+            if workspace is None:
+                continue
+            workspace.last_opened = self._storage_times.get(vsc_folder)
+            workspace.recent_rank = ranks.get(key)
+            yield workspace
+        yield from self.source_workspaces(seen)
+
+    def source_workspaces(self, known: set[str]=None) -> list[Workspace]:
+        """Get the workspaces of the enabled providers that aren't known yet (known holds normalize_path keys and is updated)
+
+        The providers run concurrently, each on its own thread. A provider that hasn't finished within provider_timeout
+          is left out (and abandoned), so a slow provider never holds up the others. Workspaces found by more than one
+          provider are kept once, from the first provider in the 'providers' setting.
+        """
+        known = set() if known is None else known
+        providers = [WorkspaceLocator.providers[name](self._settings) for name in self._settings.providers]
+        if not providers:
+            return []
+        pool = DaemonThreadPool(max_workers=len(providers), thread_name_prefix="provider")
+        futures = [pool.submit(provider.workspaces) for provider in providers]
+        deadline = time.monotonic() + self._settings.provider_timeout
+        workspaces = []
+        for future in futures:
+            try:
+                found = future.result(timeout=max(0, deadline - time.monotonic()))
+            except (FutureTimeoutError, OSError):
+                continue
+            for workspace in found:
+                key = Workspace.normalize_path(workspace.workspace)
+                if key not in known:
+                    known.add(key)
+                    workspaces.append(workspace)
+        # Don't wait for providers that are stuck (e.g. on an unresponsive drive), now or when the program exits
+        pool.shutdown(wait=False, cancel_futures=True)
+        return workspaces
+
+    def find_repositories(self) -> list[str]:
+        """Search the source roots for git repositories, listing folders in parallel (at most source_depth levels deep)
+
+        The search stops at a folder containing .git and never enters source_skip folders. The subfolders of each
+          folder are kept in source_folders.json in data_path with the folder's modification time, so unchanged
+          folders are not listed again. If no folder finishes listing within io_timeout, the rest are abandoned.
+        """
+        if not self._settings.source_roots:
+            return []
+        store = WorkspaceStore(self._settings.data_path)
+        cache: dict[str, list] = store.load("source_folders", {})
+        scanned: dict[str, list] = {}
+        skip = {name.lower() for name in self._settings.source_skip}
+        repos = []
+        pool = DaemonThreadPool(max_workers=max(1, self._settings.max_concurrency), thread_name_prefix="source")
+        try:
+            pending = {pool.submit(WorkspaceLocator._scan_folder, root, cache.get(root), skip): (root, 0) for root in self._settings.source_roots}
+            while pending:
+                done, _ = wait(pending, timeout=self._settings.io_timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Every remaining folder is hung (e.g. on a dead network share)
+                    break
+                for future in done:
+                    folder, depth = pending.pop(future)
+                    entry = future.result()
+                    if entry is None:
+                        continue
+                    scanned[folder] = entry
+                    _, subfolders, is_repo = entry
+                    if is_repo:
+                        repos.append(folder)
+                    elif depth < self._settings.source_depth:
+                        for subfolder in subfolders:
+                            pending[pool.submit(WorkspaceLocator._scan_folder, subfolder, cache.get(subfolder), skip)] = (subfolder, depth + 1)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        try:
+            store.save("source_folders", scanned)
+        except OSError:
+            # The next search lists every folder again
+            pass
+        return sorted(repos)
+
+    @classmethod
+    def _scan_folder(cls, folder: str, cached: list, skip: set[str]) -> tuple[float, list[str], bool]:
+        """Get (modification time, subfolders to search, is a repository) for a folder (None if it can't be read)
+
+        A folder's modification time changes whenever an entry is added to or removed from it, so the cached result
+          is reused while the time is unchanged
+        """
+        try:
+            mtime = path.getmtime(folder)
+        except OSError:
+            return None
+        if cached and cached[0] == mtime:
+            return cached
+        subfolders = []
+        try:
+            with scandir(folder) as entries:
+                for entry in entries:
+                    if entry.name == ".git":
+                        # A repository (or a worktree, whose .git is a file): its own folders are never searched
+                        return (mtime, [], True)
+                    if entry.name.lower() not in skip and entry.is_dir(follow_symlinks=False):
+                        subfolders.append(entry.path)
+        except OSError:
+            return (mtime, [], False)
+        return (mtime, subfolders, False)
+
+    def export_records(self, workspaces: Iterable[Workspace]=None) -> Iterator[dict[str, any]]:
+        """Get the export record (export_fields) of each workspace (streams 'iter_workspaces' if no workspaces are given)"""
+        for workspace in self.iter_workspaces() if workspaces is None else workspaces:
+            record = {name: getattr(workspace, name, None) for name in WorkspaceLocator.export_fields}
+            record["storage_size"] = WorkspaceLocator.storage_size(workspace.vsc_folder)
+            yield record
+
+    def export(self, output: TextIO, format: str="jsonl", workspaces: Iterable[Workspace]=None) -> int:
+        """Write the export records to a text stream as JSON Lines ("jsonl") or CSV ("csv"), one record at a time
+
+        Returns the number of records written
+        """
+        if format not in ("jsonl", "csv"):
+            raise ValueError(f"Unsupported export format: {format}")
+        writer = csv.DictWriter(output, WorkspaceLocator.export_fields, lineterminator="\n") if format == "csv" else None
+        if writer:
+            writer.writeheader()
+        count = 0
+        for record in self.export_records(workspaces):
+            if writer:
+                writer.writerow(record)
+            else:
+                output.write(json.dumps(record) + "\n")
+            count += 1
+        return count
+
+    @classmethod
+    def storage_size(cls, vsc_folder: str) -> int:
+        """Get the number of bytes VS Code stores for a workspace (None if there is no VS Code folder)"""
+        if not vsc_folder:
+            return None
+        size, folders = 0, [vsc_folder]
+        while folders:
+            try:
+                with scandir(folders.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            size += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+        return size
+
+    def find(self, filter_text: str) -> Sequence[Workspace]:
+        """Get the listed workspaces matching a filter query (see WorkspaceIndex), e.g. 'parent:code host:github -archive'"""
+        if not filter_text.strip():
+            return self.workspaces
+        if self._index[0] is not self._workspaces:
+            # Built on the first query after each scan
+            self._index = (self._workspaces, WorkspaceIndex(self.workspaces))
+        index = self._index[1]
+        positions = index.search(filter_text)
+        if isinstance(index.workspaces, WorkspaceSnapshot):
+            return index.workspaces.select(positions)
+        return [index.workspaces[position] for position in positions]
+
+    def rank(self, query: str, limit: int) -> list[Workspace]:
+        """Get the best matches for a query, best first
+
+        Every word of the query must appear in the display name. Matches at the start of the workspace
+          name beat matches at the start of a word in the name, which beat matches anywhere in the name,
+          which beat matches elsewhere (parent or repository). Ties keep the list order.
+        """
+        if self._search_keys[0] is not self._workspaces:
+            # Lowercase (name, display name) pairs, built once per scan instead of on every keystroke
+            workspaces = self.workspaces
+            names = WorkspaceLocator.display_names(workspaces)
+            keys = [(w.name.lower(), n.lower()) for w, n in zip(workspaces, names)] if isinstance(workspaces, list) else \
+                [(n.split(" > ", 1)[-1].split(" | ", 1)[0].lower(), n.lower()) for n in names]
+            self._search_keys = (self._workspaces, workspaces, keys)
+        _, workspaces, keys = self._search_keys
+        terms = query.lower().split()
+        scored = []
+        for index, (name, display_name) in enumerate(keys):
+            score = 0
+            for term in terms:
+                if name.startswith(term):
+                    continue
+                if f" {term}" in name or f"-{term}" in name or f"_{term}" in name:
+                    score += 1
+                elif term in name:
+                    score += 2
+                elif term in display_name:
+                    score += 3
+                else:
+                    break
+            else:
+                scored.append((score, index))
+        return [workspaces[index] for _, index in heapq.nsmallest(limit, scored)]
+
+    def group_index(self, by: str="parent") -> tuple[Sequence[Workspace], dict[str, list[int]]]:
+        """Get the listed workspaces and their positions grouped by parent folder ("parent") or repository host ("host")
+
+        The index is built once per scan, so showing the groups again costs nothing
+        """
+        if self._group_keys[0] is not self._workspaces or self._group_keys[1] != by:
+            workspaces = self.workspaces
+            self._group_keys = (self._workspaces, by, workspaces, WorkspaceLocator.group_workspaces(workspaces, by))
+        return self._group_keys[2:]
+
+    @classmethod
+    def group_workspaces(cls, workspaces: Sequence[Workspace], by: str="parent") -> dict[str, list[int]]:
+        """Group the positions of workspaces by parent folder or repository host, in group name order (list order within a group)
+
+        Snapshot rows are grouped from the snapshot columns, so no Workspace objects are created
+        """
+        if isinstance(workspaces, WorkspaceSnapshot):
+            keys = workspaces.values("parent" if by == "parent" else "repo_host")
+        else:
+            keys = [w.parent if by == "parent" else w.repo_host for w in workspaces]
+        groups: dict[str, list[int]] = {}
+        for position, key in enumerate(keys):
+            groups.setdefault(key or "(no repository)", []).append(position)
+        return dict(sorted(groups.items(), key=lambda group: group[0].lower()))
+
+    @classmethod
+    def display_names(cls, workspaces: Sequence[Workspace]) -> list[str]:
+        """Get the display names of workspaces (snapshot rows are read without creating Workspace objects)"""
+        if isinstance(workspaces, WorkspaceSnapshot):
+            return workspaces.display_names()
+        return [w.display_name for w in workspaces]
+
+    def load_snapshot(self) -> WorkspaceSnapshot:
+        """Map the snapshot saved by the last scan (None if there isn't an up to date one)"""
+        try:
+            storage_mtime = path.getmtime(self._settings.workspace_path)
+        except OSError:
+            return None
+        return WorkspaceSnapshot.load(self.snapshot_file, WorkspaceSnapshot.fingerprint(self._settings), storage_mtime)
+
+    def _snapshot_sources_current(self, snapshot: WorkspaceSnapshot) -> bool:
+        """Check that the providers (e.g. the source roots) still find the workspaces saved in a snapshot
+
+        The storage folder's modification time only covers VS Code's workspaces, so the providers run again (the
+          source root search only lists folders that changed since it last ran).
+        """
+        keys = [(Workspace.normalize_path(folder), source) for folder, source in zip(snapshot.values("workspace"), snapshot.values("source"))]
+        listed = {key for key, source in keys if source != "vscode"}
+        found = {Workspace.normalize_path(w.workspace) for w in self.source_workspaces({key for key, source in keys if source == "vscode"})}
+        return found == listed
+
+    def save_snapshot(self) -> None:
+        """Save the scanned workspaces as a snapshot for the next start (failures only cost the next start a scan)"""
+        try:
+            # Skipped when another launcher is saving the same snapshot right now
+            with WorkspaceStore(self._settings.data_path).lock("workspaces", timeout=0):
+                WorkspaceSnapshot.save(self.snapshot_file, list(self._workspaces), WorkspaceSnapshot.fingerprint(self._settings),
+                                       path.getmtime(self._settings.workspace_path))
+        except OSError:
+            pass
+
+    @property
+    def snapshot_file(self) -> str:
+        """Path to the workspace snapshot file"""
+        return path.join(self._settings.data_path, "workspaces.snapshot")
+
+    def start_refresh(self, on_change: Callable[[Workspace], None]) -> WorkspaceRefreshScheduler:
+        """Start re-checking the workspaces in the background (call 'stop' on the result when done)"""
+        scheduler = WorkspaceRefreshScheduler(self, on_change)
+        scheduler.start()
+        return scheduler
+
+    def refreshed(self) -> None:
+        """Forget anything derived from the workspaces after they were changed by a refresh"""
+        self._search_keys = (None, [], [])
+        self._group_keys = (None, None, [], {})
+        self._index = (None, None)
+
+    def stale_workspaces(self, days: float) -> list[Workspace]:
+        """Get the workspaces VS Code hasn't used for the given number of days (and no longer lists as recent)"""
+        cutoff = time.time() - days * 86400
+        return [w for w in self._workspaces if w.recent_rank is None and w.last_opened is not None and w.last_opened < cutoff]
+
+    def clean_up_orphans(self) -> None:
+        """Delete orphan workspaces (only those confirmed by find_orphans)"""
+        orphans = self.find_orphans()
+        for workspace in orphans:
+            shutil.rmtree(workspace.vsc_folder, ignore_errors=True)
+        self._workspaces = [w for w in self._workspaces if w not in orphans]
+
+    def find_orphans(self) -> list[Workspace]:
+        """Record this scan's missing workspaces and get those missing for orphan_min_scans scans and orphan_min_days days
+
+        A workspace only counts as missing if its drive (or network share) is reachable, so an unmounted
+          drive never counts against its workspaces. Elsewhere than on Windows that is its parent folder (see
+          _volume_root). The drives are checked concurrently, each within io_timeout.
+        """
+        missing = [w for w in self._workspaces if not w.exists and w.vsc_folder]
+        reachable = self._reachable_roots({WorkspaceLocator._volume_root(w.workspace) for w in missing})
+        now = time.time()
+
+        def record_scan(history: dict[str, dict[str, float]]) -> dict[str, dict[str, float]]:
+            records: dict[str, dict[str, float]] = {}
+            for workspace in missing:
+                record = history.get(workspace.vsc_folder)
+                if reachable[WorkspaceLocator._volume_root(workspace.workspace)]:
+                    record = record or {"first_missing": now, "misses": 0}
+                    record["misses"] += 1
+                if record:
+                    records[workspace.vsc_folder] = record
+            # Workspaces that were found again (or whose VS Code folder is gone) drop out of the history
+            return records
+
+        try:
+            # Read and written under the store lock, so two launchers scanning at once both count
+            records = WorkspaceStore(self._settings.data_path).update("orphans", record_scan, {})
+        except OSError:
+            # Without a history no workspace can be confirmed as an orphan
+            return []
+        return [w for w in missing if w.vsc_folder in records
+                and records[w.vsc_folder]["misses"] >= self._settings.orphan_min_scans
+                and now - records[w.vsc_folder]["first_missing"] >= self._settings.orphan_min_days * 86400]
+
+    def _reachable_roots(self, roots: set[str]) -> dict[str, bool]:
+        """Check concurrently which drive roots are reachable (a check that takes longer than io_timeout counts as unreachable)"""
+        if not roots:
+            return {}
+        pool = DaemonThreadPool(max_workers=min(len(roots), self._settings.max_concurrency), thread_name_prefix="reachable")
+        futures = {root: pool.submit(WorkspaceLocator._root_reachable, root) for root in roots}
+        deadline = time.monotonic() + self._settings.io_timeout
+        reachable = {}
+        for root, future in futures.items():
+            try:
+                reachable[root] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except (FutureTimeoutError, OSError):
+                reachable[root] = False
+        # Don't wait for checks that are stuck on an unresponsive drive, now or when the program exits
+        pool.shutdown(wait=False, cancel_futures=True)
+        return reachable
+
+    @classmethod
+    def _volume_root(cls, folder: str) -> str:
+        """Get the root of the drive (or network share) containing a folder
+
+        Without drives (Linux and macOS) this is the parent folder, since network shares are mounted anywhere below '/'.
+        """
+        drive = path.splitdrive(folder)[0]
+        if drive:
+            return f"{drive}{path.sep}"
+        return path.dirname(path.normpath(folder)) or path.sep
+
+    @classmethod
+    def _root_reachable(cls, root: str) -> bool:
+        """Check whether a drive root (or, without drives, the parent folder of a missing folder) can be read"""
+        if not path.isdir(root):
+            # Gone along with the folder, e.g. a share mounted further up isn't mounted
+            return False
+        if path.splitdrive(root)[0] or path.ismount(root):
+            return True
+        # A share that isn't mounted leaves only its empty mount point folder behind
+        with scandir(root) as entries:
+            return next(entries, None) is not None
+
+    def compact_state(self, workspaces: Iterable[Workspace]=None) -> dict[str, int]:
+        """Checkpoint and vacuum the state databases of existing workspaces, at most compact_concurrency at once
+
+        Returns the bytes reclaimed per workspace folder (databases VS Code is using are skipped and left out). Nothing
+          is compacted while VS Code or VS Code Server is running: it holds no lock on the database of an open workspace
+          between writes.
+        """
+        if WorkspaceLauncher.vscode_running(self._settings.exe_path) or WorkspaceLauncher.vscode_server_running():
+            self._compacted = {}
+            return self._compacted
+        workspaces = [w for w in (self._workspaces if workspaces is None else workspaces) if w.exists and w.vsc_folder]
+        with ThreadPoolExecutor(max_workers=self._settings.compact_concurrency, thread_name_prefix="compact") as pool:
+            results = list(zip(workspaces, pool.map(WorkspaceLocator.compact_database, (w.vsc_folder for w in workspaces))))
+        self._compacted = {w.workspace: reclaimed for w, reclaimed in results if reclaimed is not None}
+        return self._compacted
+
+    def compact_later(self) -> threading.Thread:
+        """Run 'compact_state' on a background thread, so the workspaces can be shown without waiting for it"""
+        # Not a daemon thread: exiting waits for a database being rewritten instead of leaving its journal behind
+        thread = threading.Thread(target=self.compact_state, name="compact")
+        thread.start()
+        return thread
+
+    @classmethod
+    def compact_database(cls, vsc_folder: str) -> int:
+        """Checkpoint and vacuum the state database of a VS Code folder and get the bytes reclaimed
+
+        Returns None if there is no database or VS Code is using it: SQLite keeps a journal (or WAL) file next to
+          a database while a connection is writing to it, and an exclusive lock can't be taken while one is reading.
+        """
+        database = path.join(vsc_folder, "state.vscdb")
+        if not path.isfile(database) or any(path.exists(f"{database}{suffix}") for suffix in WorkspaceLocator._sqlite_lock_files):
+            return None
+        try:
+            before = path.getsize(database)
+            # No busy timeout: a database that is locked right now is skipped, never waited for
+            connection = sqlite3.connect(database, timeout=0, isolation_level=None)
+            try:
+                connection.execute("BEGIN EXCLUSIVE")
+                connection.execute("COMMIT")
+                connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                if connection.execute("PRAGMA freelist_count").fetchone()[0]:
+                    # Only rewrite the database if it has free pages to give back
+                    connection.execute("VACUUM")
+            finally:
+                connection.close()
+            return before - path.getsize(database)
+        except (sqlite3.Error, OSError):
+            return None
+
+    def clean_up_duplicates(self) -> None:
+        """Delete VS Code folders that duplicate another VS Code folder for the same workspace"""
+        for vsc_folder in self._duplicates:
+            # A folder VS Code has open (or that is already gone) is left for the next clean up
+            shutil.rmtree(vsc_folder, ignore_errors=True)
+        self._duplicates = []
+
+    def _storage_folders(self) -> list[str]:
+        """Get the VS Code folders in the workspace storage folder"""
+        # VS Code's writes to a folder's state database update the folder's modification time, which scandir
+        #   reports without extra file system calls on Windows
+        self._storage_times = {f.path: f.stat().st_mtime for f in scandir(self._settings.workspace_path) if f.is_dir()}
+        # Newest first, so the VS Code folder that is kept for a workspace is the one VS Code used last
+        return sorted(self._storage_times, key=self._storage_times.get, reverse=True)
+
+    def _unique_workspace_folders(self, folders: Iterable[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Get the (VS Code folder, workspace folder) pairs that point to distinct workspace folders"""
+        unique: dict[str, tuple[str, str]] = {}
+        self._duplicates = []
+        for vsc_folder, ws_path in folders:
+            if ws_path is None:
+                continue
+            key = Workspace.normalize_path(ws_path)
+            if key in unique:
+                # The workspace folder is already listed, so only record the redundant VS Code folder
+                self._duplicates.append(vsc_folder)
+                continue
+            unique[key] = (vsc_folder, ws_path)
+        return list(unique.values())
+
+    def _complete_workspaces(self, workspaces: Iterable[Workspace]) -> list[Workspace]:
+        """Add the last opened times and recently opened positions to the workspaces and sort them for display"""
+        workspaces = [w for w in workspaces if w is not None]
+        ranks = VSCodeState(self._settings.workspace_path).recent_ranks()
+        for workspace in workspaces:
+            workspace.last_opened = self._storage_times.get(workspace.vsc_folder)
+            workspace.recent_rank = ranks.get(Workspace.normalize_path(workspace.workspace))
+        return self._sort_workspaces(workspaces)
+
+    def _sort_workspaces(self, workspaces: Iterable[Workspace]) -> list[Workspace]:
+        """Sort the workspaces for display"""
+        if self._settings.sort_by == "recent":
+            # Recently opened list order first, then the rest by the last time VS Code used them
+            return sorted(workspaces, key=lambda w: (w.recent_rank is None, w.recent_rank or 0, -(w.last_opened or 0), w.display_name))
+        return sorted(workspaces, key=lambda w: w.display_name)
+    #endregion
+#endregion
+
+#region AsyncWorkspaceLocator
+class AsyncWorkspaceLocator(WorkspaceLocator):
+    """Locator for VS Code Workspaces on PC that discovers workspaces as bounded, time-limited asyncio tasks"""
+
+    #region Constructor
+    def __init__(self, settings: WorkspaceSettings=None, settings_json: dict[str, any]=None, settings_file: str=None) -> None:
+        """Initialize (workspaces are not loaded until 'load' is awaited)"""
+        super().__init__(settings, settings_json, settings_file, load=False)
+        self._timed_out: list[str] = []
+        self._hung_shares: set[str] = set()
+        self._semaphore: asyncio.Semaphore = None
+        self._pool: DaemonThreadPool = None
+
+    @classmethod
+    async def create(cls, settings: WorkspaceSettings=None, settings_json: dict[str, any]=None, settings_file: str=None) -> "AsyncWorkspaceLocator":
+        """Factory: Initialize and await the workspace discovery"""
+        locator = cls(settings, settings_json, settings_file)
+        await locator.load()
+        return locator
+    #endregion
+
+    #region Properties
+    @property
+    def timed_out(self) -> list[str]:
+        """VS Code folders whose workspace could not be read or probed within the I/O timeout"""
+        return self._timed_out
+    #endregion
+
+    #region Helper Functions
+    async def load(self) -> list[Workspace]:
+        """Discover the workspaces and perform the configured clean up"""
+        self._workspaces = await self.load_workspaces_async()
+        if self._settings.clean_up_duplicates:
+            self.clean_up_duplicates()
+        if self._settings.clean_up_orphans:
+            self.clean_up_orphans()
+        if self._settings.compact_state:
+            self.compact_later()
+        return self.workspaces
+
+    async def load_workspaces_async(self) -> list[Workspace]:
+        """Scans the PC for VS Code workspaces without letting one slow folder hold up the others"""
+        self._semaphore = asyncio.Semaphore(max(1, self._settings.max_concurrency))
+        self._timed_out = []
+        self._hung_shares = set()
+        # Timed out calls stay on daemon workers, so neither asyncio.run nor the program waits for them (each one gets
+        #   a replacement worker, so hung calls never take the place of the calls admitted by the semaphore)
+        self._pool = DaemonThreadPool(max(1, self._settings.max_concurrency), thread_name_prefix="locator")
+        try:
+            vsc_folders = await self._run(None, self._storage_folders) or []
+            ws_paths = await asyncio.gather(*(self._run(f, Workspace.read_workspace_folder, f) for f in vsc_folders))
+            folders = self._unique_workspace_folders(zip(vsc_folders, ws_paths))
+            workspaces = await asyncio.gather(*(
+                self._run(vsc_folder, Workspace.from_workspace_folder, ws_path, vsc_folder, self._settings.show_repos, self._settings.show_glyphs,
+                          self._settings.repo_hosts, share=AsyncWorkspaceLocator._network_share(ws_path))
+                for vsc_folder, ws_path in folders))
+            # The source root search applies io_timeout to each folder itself
+            workspaces += await asyncio.to_thread(self.source_workspaces, {Workspace.normalize_path(ws_path) for _, ws_path in folders})
+            return await self._run(None, self._complete_workspaces, workspaces) or self._sort_workspaces(w for w in workspaces if w)
+        finally:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, vsc_folder: str, func: Callable, *args, share: str=None) -> any:
+        """Run a blocking I/O function on a daemon worker thread, giving up once it has run for the I/O timeout
+
+        Calls on a network share that already hung once are not started at all.
+        """
+        async with self._semaphore:
+            if share in self._hung_shares:
+                self._timed_out.append(vsc_folder)
+                return None
+            loop = asyncio.get_running_loop()
+            started = loop.create_future()
+            call = loop.run_in_executor(self._pool, partial(AsyncWorkspaceLocator._signal_start, loop, started, func, *args))
+            # Time spent queued behind other calls does not count toward the timeout
+            await asyncio.wait({started, call}, return_when=asyncio.FIRST_COMPLETED)
+            try:
+                return await asyncio.wait_for(call, self._settings.io_timeout)
+            except (TimeoutError, asyncio.TimeoutError):
+                # The worker thread cannot be interrupted, but nothing waits on it any longer
+                self._pool.abandon()
+                if share:
+                    self._hung_shares.add(share)
+                if vsc_folder:
+                    self._timed_out.append(vsc_folder)
+                return None
+
+    @staticmethod
+    def _signal_start(loop: asyncio.AbstractEventLoop, started: asyncio.Future, func: Callable, *args) -> any:
+        """Tell the event loop that a call has started on its worker, then make the call"""
+        loop.call_soon_threadsafe(lambda: started.done() or started.set_result(None))
+        return func(*args)
+
+    @staticmethod
+    def _network_share(folder: str) -> str:
+        """Get the UNC share (\\\\server\\share) holding a folder (None for a local or mapped drive)"""
+        drive = path.splitdrive(folder)[0]
+        return drive.lower() if drive[:2] in ("\\\\", "//") else None
+    #endregion
+#endregion
+
+#region WorkspaceProfile
+@dataclass
+class WorkspaceProfile:
+    """Result of scanning one user profile for the machine-wide WorkspaceInventory"""
+
+    #region Attributes
+    user:           str=None    # Name of the user owning the profile
+    workspace_path: str=None    # VS Code workspace storage folder of the profile
+    workspaces:     list[Workspace]=field(default_factory=list)
+                                # Workspaces found in the profile (tagged with the user)
+    orphan_bytes:   int=0       # Bytes of VS Code storage held for workspace folders that are missing
+    complete:       bool=True   # False if the scan ran out of its budget or the storage folder couldn't be read
+    error:          str=None    # Why the storage folder couldn't be read (e.g. access denied)
+    #endregion
+
+    #region Properties
+    @property
+    def missing(self) -> int:
+        """Number of workspaces whose folder is missing"""
+        return sum(1 for w in self.workspaces if not w.exists)
+    #endregion
+#endregion
+
+#region WorkspaceInventory
+class WorkspaceInventory:
+    """Machine-wide list of the workspaces of every user profile (for administrators of shared machines)
+
+    The profiles are scanned concurrently (at most profile_concurrency at once). Each profile gets its own I/O
+      budget: VS Code folders are read at most profile_rate per second, and the scan of a profile stops after
+      profile_budget seconds, so an inventory can run during working hours without crowding out the users.
+    """
+
+    # Query fields added to those of WorkspaceIndex
+    fields: ClassVar[dict[str, str]] = {**WorkspaceIndex.fields, "user": "user"}
+
+    #region Constructor
+    def __init__(self, settings: WorkspaceSettings) -> None:
+        """Initialize (nothing is scanned until 'scan' is called)"""
+        self._settings = settings
+        self._profiles: dict[str, WorkspaceProfile] = {}
+        self._homes: dict[str, str] = {}
+        self._index: WorkspaceIndex = None
+    #endregion
+
+    #region Properties
+    @property
+    def profiles(self) -> dict[str, WorkspaceProfile]:
+        """Profiles of the last scan, keyed by user"""
+        return self._profiles
+
+    @property
+    def workspaces(self) -> list[Workspace]:
+        """Workspaces of every profile of the last scan, by user"""
+        return [w for user in sorted(self._profiles) for w in self._profiles[user].workspaces]
+    #endregion
+
+    #region Helper Functions
+    def scan(self, users: Iterable[str]=None) -> dict[str, WorkspaceProfile]:
+        """Scan the profiles of some users (every profile on the machine when None) concurrently"""
+        self._homes = WorkspaceSettings.profile_homes()
+        users = list(WorkspaceSettings.profile_users(self._homes) if users is None else users)
+        with ThreadPoolExecutor(max_workers=max(1, min(len(users), self._settings.profile_concurrency)), thread_name_prefix="profile") as pool:
+            self._profiles = dict(zip(users, pool.map(self.scan_profile, users)))
+        self._index = None
+        return self._profiles
+
+    def scan_profile(self, user: str) -> WorkspaceProfile:
+        """Scan the workspace storage of one user within the per-profile budget"""
+        settings = self._settings.for_user(user, self._homes.get(user))
+        profile = WorkspaceProfile(user, settings.workspace_path)
+        started = time.monotonic()
+        deadline = started + self._settings.profile_budget
+        try:
+            for count, workspace in enumerate(WorkspaceLocator(settings, load=False).iter_workspaces(), 1):
+                workspace.user = user
+                profile.workspaces.append(workspace)
+                if not workspace.exists:
+                    profile.orphan_bytes += WorkspaceLocator.storage_size(workspace.vsc_folder) or 0
+                # Pace the reads to profile_rate VS Code folders per second
+                delay = started + count / self._settings.profile_rate - time.monotonic()
+                if time.monotonic() + max(0, delay) >= deadline:
+                    profile.complete = False
+                    break
+                if delay > 0:
+                    time.sleep(delay)
+        except OSError as e:
+            # Typically a profile the current user isn't allowed to read
+            profile.complete, profile.error = False, str(e)
+        return profile
+
+    def find(self, filter_text: str) -> list[Workspace]:
+        """Get the workspaces of every profile matching a filter query (with 'user:name' on top of the WorkspaceIndex fields)"""
+        workspaces = self.workspaces
+        if self._index is None:
+            self._index = WorkspaceIndex(workspaces, WorkspaceInventory.fields)
+        return [workspaces[position] for position in self._index.search(filter_text)]
+
+    def report(self, output: TextIO) -> None:
+        """Write one line per profile: user, workspaces, missing workspaces and the bytes of orphaned storage"""
+        for user in sorted(self._profiles):
+            profile = self._profiles[user]
+            status = "" if profile.complete else f" (incomplete{': ' + profile.error if profile.error else ''})"
+            output.write(f"{user:<20} {len(profile.workspaces):>6} workspaces {profile.missing:>6} missing "
+                         f"{WorkspaceDetails.format_size(profile.orphan_bytes):>10} orphaned{status}\n")
+    #endregion
+#endregion
+
+#region WorkspaceInstance
+class WorkspaceInstance:
+    """Single-instance lock and signal channel for the launcher
+
+    The first launcher listens on a local port (bound exclusively, so holding the port is the lock). A later
+      launcher finds the port taken and asks the first one to show its window instead of starting another.
+      Any local user can connect to the port, so a request is only answered if it carries the secret kept in
+      the user's data_path (instance.token, readable only by the user).
+    """
+
+    # Request and reply sent over the channel (the request is followed by the token)
+    show_request: ClassVar[bytes] = b"SHOW "
+    show_reply: ClassVar[bytes] = b"OK"
+    # Random bytes in the token (written as hexadecimal)
+    token_bytes: ClassVar[int] = 32
 
     #region Constructor
-    def __init__(self, settings: WorkspaceSettings=None, settings_json: dict[str, any]=None, settings_file: str=None) -> None:
+    def __init__(self, settings: WorkspaceSettings) -> None:
         """Initialize"""
-        # Get settings
         self._settings = settings
-        if not self._settings:
-            try:
-                self._settings = WorkspaceSettings.from_dict(settings_json) if settings_json else WorkspaceSettings.from_file(settings_file)
-            except:
-                self._settings = WorkspaceSettings()
-        self._workspaces = self.load_workspaces()
-        if self._settings.clean_up_orphans:
-            self.clean_up_orphans()
+        self.port = settings.instance_port or WorkspaceInstance.default_port(settings.username)
+        self._server: socket.socket = None
+        self._token: bytes = None
     #endregion
-    
+
     #region Properties
     @property
-    def workspaces(self) -> list[Workspace]:
-        return self._workspaces if not self._settings.hide_missing else [w for w in self._workspaces if w.exists]
+    def token_file(self) -> str:
+        """Path to the file holding the user's secret for the channel"""
+        return path.join(self._settings.data_path, "instance.token")
     #endregion
 
     #region Helper Functions
-    def load_workspaces(self) -> list[Workspace]:
-        """Scans the PC for VS Code workspaces"""
-        folders = [f.path for f in scandir(self._settings.workspace_path) if f.is_dir()]
-        workspaces = [Workspace.from_vscode_folder(f, self._settings.show_repos, self._settings.show_glyphs) for f in folders]
-        return sorted([w for w in workspaces if w is not None], key=lambda w: w.display_name)
+    def acquire(self) -> bool:
+        """Take the lock by listening on the port (returns False if another launcher already holds it)"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            # Windows lets a second socket bind the same port unless the first one asks for exclusive use
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            # Elsewhere this only allows binding while connections of a closed launcher linger, never a second listener
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            server.bind(("127.0.0.1", self.port))
+            server.listen()
+        except OSError:
+            server.close()
+            return False
+        self._server = server
+        return True
 
-    def clean_up_orphans(self) -> None:
-        """Delete orphan workspaces"""
-        for workspace in [w for w in self._workspaces if not w.exists]:
-            shutil.rmtree(workspace.vsc_folder)
-        self._workspaces = self.load_workspaces()
+    def signal(self) -> bool:
+        """Ask the launcher holding the lock to show its window (returns False if it didn't answer)"""
+        try:
+            request = WorkspaceInstance.show_request + self.token()
+            with socket.create_connection(("127.0.0.1", self.port), timeout=self._settings.io_timeout) as client:
+                client.sendall(request)
+                return client.recv(len(WorkspaceInstance.show_reply)) == WorkspaceInstance.show_reply
+        except OSError:
+            return False
+
+    def token(self) -> bytes:
+        """Get the user's secret for the channel, creating the token file (readable only by the user) on first use"""
+        if self._token:
+            return self._token
+        size = WorkspaceInstance.token_bytes * 2
+        for _ in range(WorkspaceStore.read_attempts):
+            try:
+                with open(self.token_file, "rb") as f:
+                    token = f.read()
+                if len(token) == size:
+                    self._token = token
+                    return token
+            except FileNotFoundError:
+                os.makedirs(self._settings.data_path, exist_ok=True)
+                try:
+                    # Only the user may read it (on Windows the user's AppData folder is already private)
+                    fd = os.open(self.token_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                except FileExistsError:
+                    # Another launcher is creating it right now
+                    continue
+                self._token = secrets.token_hex(WorkspaceInstance.token_bytes).encode("ascii")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(self._token)
+                return self._token
+            # Still being written by another launcher
+            time.sleep(0.05)
+        raise OSError(f"{self.token_file} is not a valid token file")
+
+    def serve(self, on_show: Callable[[], None]) -> None:
+        """Answer show requests on a background thread (on_show is called on that thread)"""
+        try:
+            request = WorkspaceInstance.show_request + self.token()
+        except OSError:
+            # Without a token no request can be trusted, so later launchers time out and run on their own
+            return
+        threading.Thread(target=self._serve, args=(self._server, request, on_show), name="single-instance", daemon=True).start()
+
+    def close(self) -> None:
+        """Release the lock"""
+        if self._server:
+            server, self._server = self._server, None
+            try:
+                # Wakes up the serving thread, which would otherwise keep the port open while waiting in accept
+                server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            server.close()
+
+    def _serve(self, server: socket.socket, request: bytes, on_show: Callable[[], None]) -> None:
+        """Accept connections until the lock is released, answering only requests that carry the token"""
+        while True:
+            try:
+                client, _ = server.accept()
+            except OSError:
+                # Closed by 'close'
+                break
+            with client:
+                try:
+                    client.settimeout(self._settings.io_timeout)
+                    received = b""
+                    while len(received) < len(request):
+                        chunk = client.recv(len(request) - len(received))
+                        if not chunk:
+                            break
+                        received += chunk
+                    if hmac.compare_digest(received, request):
+                        on_show()
+                        client.sendall(WorkspaceInstance.show_reply)
+                except OSError:
+                    continue
+
+    @classmethod
+    def default_port(cls, username: str) -> int:
+        """Get a port in the dynamic range that is the same for every launcher of a user"""
+        return 49152 + zlib.crc32(username.lower().encode("utf-8")) % 16384
     #endregion
 #endregion
 
@@ -222,13 +2830,13 @@ class WorkspaceLocator:
 class WorkspaceLauncher:
     """UI for interacting with the list of workspaces"""
 
+    # Seconds a batch launch waits for VS Code to fail early (a process still running after this has opened the workspace)
+    launch_wait: ClassVar[float] = 5.0
+
     #region Constructor
     def __init__(self, settings: WorkspaceSettings=None, settings_file: str=None) -> None:
         """Initialize"""
-        self._settings = settings
-        if not self._settings:
-            self._settings = WorkspaceSettings.from_file(settings_file) if settings_file else WorkspaceSettings()
-        self._workspace_locator = WorkspaceLocator(self._settings)
+        self._init_launcher(settings, settings_file)
         
         # UI Controls:
         text = (self._settings.font, self._settings.font_size)
@@ -253,25 +2861,53 @@ class WorkspaceLauncher:
             key="-URL-"
         )
         # Create and populate the workspace select list
+        self._names = self.list_names(self._workspace_locator.workspaces)
         self.workspace_selector = sg.Combo(
-            [w.display_name for w in self._workspace_locator.workspaces],
+            self._names,
             enable_events=True,
             font=(self._settings.font, self._settings.font_size),
             key="-DROPDOWN-"
         )
+        # Button to open every workspace in the (filtered) select list
+        self.open_all_button = sg.Button(
+            button_text="Open all",
+            key="-OPEN-ALL-"
+        )
+        # Status line for progress and failures of batch launches
+        self.status_text = sg.Text(
+            text="",
+            font=text,
+            key="-STATUS-"
+        )
+        # Details of the selected workspace (gathered in the background)
+        self.details_text = sg.Text(
+            text="",
+            font=text,
+            size=(None, 5 if self._settings.show_weight else 4),
+            visible=self._settings.show_details,
+            key="-DETAILS-TEXT-"
+        )
         # UI window layout
         self.window_layout = [
-            [sg.Text("Filter:", font=text), self.workspace_filter, self.vsc_toggle, self.url_toggle],
-            [self.workspace_selector]
+            [sg.Text("Filter:", font=text), self.workspace_filter, self.vsc_toggle, self.url_toggle, self.open_all_button],
+            [self.workspace_selector],
+            [self.details_text],
+            [self.status_text]
         ]
         # UI Window
         self.window = sg.Window(
             title="Workspace Launcher for Visual Studio Code",
             icon=self.resource_path("rocket.ico"),
             layout=self.window_layout,
-            margins=(0, 0)
+            margins=(0, 0),
+            enable_close_attempted_event=self.resident
         )
-        self.window.Location = self.get_ui_position(self.window)
+        self._start_window()
+        # Progress of the current batch launch: [total, launched, failures]
+        self._batch: list = [0, 0, []]
+        # Background details for the selected workspace
+        self._details_cache = WorkspaceDetailsCache(
+            lambda w, _: self.window.write_event_value("-DETAILS-", w), self._settings.details_ttl, self._settings.size_ttl)
     #endregion
 
     #region GUI Execution
@@ -293,17 +2929,30 @@ class WorkspaceLauncher:
                 # Halt processing if the user closes the UI
                 break
 
+            if event == sg.WINDOW_CLOSE_ATTEMPTED_EVENT:
+                # Staying resident: hide the window until the launcher is started again
+                self.window.hide()
+
+            if event == "-SHOW-":
+                # The launcher was started again: show the window with a cleared filter
+                filter_text = ""
+                workspaces = self.on_show()
+                selected_workspace = None
+                self.details_text.update("")
+
             if event == "-FILTER-" and values["-FILTER-"] != filter_text:
                 # Reload the filtered workspace list if the user changes the filter text
                 filter_text = values["-FILTER-"]
                 workspaces = self.on_filter_change(filter_text)
                 if selected_workspace not in workspaces:
                     selected_workspace = None
+                    self.details_text.update("")
 
             if event == "-DROPDOWN-":
                 # When the user selects a workspace from the dropdown list, perform the action(s) identified
                 #   by the checkboxes
-                selected_workspace = next(w for w in workspaces if w.display_name == values["-DROPDOWN-"])
+                selected_workspace = workspaces[self._names.index(values["-DROPDOWN-"])]
+                self.show_details(selected_workspace)
                 self.on_workspace_select(selected_workspace)
 
             if event == "-VSC-":
@@ -316,18 +2965,51 @@ class WorkspaceLauncher:
                 #   launch the repository (if it exists) in the browser
                 self.on_url_toggle_change(selected_workspace)
 
-        self.window.close()
+            if event == "-OPEN-ALL-":
+                # When the user clicks the open all button, launch every workspace in the filtered list
+                self.on_open_all(workspaces)
+
+            if event == "-BATCH-":
+                # A workspace from the batch launch has finished launching (or failed)
+                self.on_batch_progress(*values["-BATCH-"])
+
+            if event == "-DETAILS-" and values["-DETAILS-"] is selected_workspace:
+                # Details finished loading in the background for the selected workspace
+                self.show_details(selected_workspace)
+
+            if event == "-REFRESH-":
+                # The background refresh changed a workspace, so rebuild the filtered list
+                workspaces = self.on_filter_change(filter_text)
+                if selected_workspace not in workspaces:
+                    selected_workspace = None
+
+        self._details_cache.close()
+        self._close_window()
     #endregion
 
     #region Event handlers
     def on_filter_change(self, filter_text: str):
         """Update the filtered workspace list when the user changes the filter text"""
-        workspaces = [w for w in self._workspace_locator.workspaces if filter_text.lower() in w.display_name.lower()]
-        self.window["-DROPDOWN-"].update(values=[w.display_name for w in workspaces])
+        workspaces = self._workspace_locator.find(filter_text)
+        self._names = self.list_names(workspaces)
+        self.window["-DROPDOWN-"].update(values=self._names)
+        return workspaces
+
+    def on_show(self) -> Sequence[Workspace]:
+        """Show the window with a cleared filter and give it the focus (when the launcher is started again)"""
+        self.window.un_hide()
+        self.window.bring_to_front()
+        self.workspace_filter.update("")
+        workspaces = self.on_filter_change("")
+        self.window.force_focus()
+        self.workspace_filter.set_focus()
         return workspaces
 
     def on_workspace_select(self, selected_workspace: Workspace) -> None:
         """Perform the selected actions when the user selects a workspace"""
+        # Warm the file cache for VS Code's first indexing pass
+        if self._prefetcher:
+            self._prefetcher.start(selected_workspace)
         # Launch the workspace in VS Code
         if self.vsc_toggle.get():
             self.launch_workspace(selected_workspace)
@@ -346,10 +3028,69 @@ class WorkspaceLauncher:
         if not self.url_toggle.get() or not selected_workspace:
             return
         self.launch_repository(selected_workspace)
+
+    def on_open_all(self, workspaces: list[Workspace]) -> None:
+        """Launch every listed workspace in VS Code after the user confirms"""
+        if not workspaces or self._batch[1] < self._batch[0]:
+            # Nothing to open, or a batch launch is still running
+            return
+        if len(workspaces) > 1 and sg.popup_yes_no(f"Open {len(workspaces)} workspaces in VS Code?", title="Open all") != "Yes":
+            return
+        self._batch = [len(workspaces), 0, []]
+        self.status_text.update(f"Opening {len(workspaces)} workspaces...")
+        self.launch_workspaces(workspaces)
+
+    def on_batch_progress(self, workspace: Workspace, error: str) -> None:
+        """Show the progress and failures of the batch launch"""
+        total, launched, failures = self._batch
+        self._batch[1] = launched = launched + 1
+        if error:
+            failures.append(f"{workspace.display_name}: {error}")
+        failed = f" ({len(failures)} failed)" if failures else ""
+        self.status_text.update(f"Opened {launched - len(failures)} of {total} workspaces{failed}")
+        if launched == total and failures:
+            sg.popup_error("These workspaces could not be opened:", *failures, title="Open all")
     #endregion
 
     #region Helper functions
-    def get_ui_position(self, window: sg.Window) -> tuple[int, int]:
+    def _init_launcher(self, settings: WorkspaceSettings, settings_file: str) -> None:
+        """Load the settings and the workspaces, and create the background helpers every launcher UI shares"""
+        import_gui()
+        self._settings = settings
+        if not self._settings:
+            self._settings = WorkspaceSettings.from_file(settings_file) if settings_file else WorkspaceSettings()
+        self._workspace_locator = WorkspaceLocator(self._settings)
+        self._weights = WorkspaceWeightAnalyzer(self._settings) if self._settings.show_weight else None
+        self._prefetcher = WorkspacePrefetcher(self._settings, settings_file) if self._settings.prefetch else None
+        self._refresher: WorkspaceRefreshScheduler = None
+
+    def _start_window(self) -> None:
+        """Position the new window, then start prewarming VS Code and refreshing the workspaces (if turned on)"""
+        self.window.Location = self.get_ui_position(self.window)
+        if self.window.TKroot:
+            # A finalized window is already showing, so it has to be moved into place
+            self.window.move(*self.window.Location)
+        if self._settings.prewarm_vscode:
+            # Get VS Code started while the user is still choosing
+            threading.Thread(target=self.prewarm_vscode, daemon=True).start()
+        self._refresher = self.start_refresh()
+
+    def _close_window(self) -> None:
+        """Stop the background helpers every launcher UI shares and close the window"""
+        if self._weights:
+            self._weights.close()
+        if self._prefetcher:
+            self._prefetcher.stop()
+        if self._refresher:
+            self._refresher.stop()
+        self.window.close()
+
+    @property
+    def resident(self) -> bool:
+        """True if closing the window only hides it (stay_resident only applies to a single instance)"""
+        return self._settings.single_instance and self._settings.stay_resident
+
+    def get_ui_position(self, window: "sg.Window") -> tuple[int, int]:
         # Set the position for the UI window
         x_size, y_size = window.get_screen_dimensions()
         x, y = self._settings.x_location, self._settings.y_location
@@ -359,16 +3100,124 @@ class WorkspaceLauncher:
     
     def launch_workspace(self, selected_workspace: Workspace):
         """Open the selected workspace an instance of Visual Studio code"""
-        # Launch a subprocess to open the workspace in VS Code
-        args = [self._settings.exe_path, selected_workspace.workspace]
-        subprocess.call(args)
+        # Launch a subprocess to open the workspace in VS Code (a running instance takes over and the subprocess exits)
+        subprocess.Popen(WorkspaceLauncher.vscode_args(self._settings, selected_workspace.workspace))
+
+    def start_refresh(self) -> WorkspaceRefreshScheduler:
+        """Start the background refresh of the workspaces if it is turned on (a -REFRESH- event is sent for each change)"""
+        if not self._settings.background_refresh:
+            return None
+        return self._workspace_locator.start_refresh(lambda w: self.window.write_event_value("-REFRESH-", w))
+
+    def prewarm_vscode(self) -> None:
+        """Start VS Code minimized with an empty window if it isn't running, so launches only hand off to it"""
+        if WorkspaceLauncher.vscode_running(self._settings.exe_path):
+            return
+        startupinfo = None
+        if hasattr(subprocess, "STARTUPINFO"):
+            # Ask Windows to show the first window minimized without taking the focus (SW_SHOWMINNOACTIVE)
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = 7
+        try:
+            subprocess.Popen([self._settings.exe_path, "--new-window"], startupinfo=startupinfo,
+                             creationflags=getattr(subprocess, "DETACHED_PROCESS", 0))
+        except OSError:
+            # Launches will simply start VS Code themselves
+            pass
+
+    @classmethod
+    def vscode_args(cls, settings: WorkspaceSettings, workspace_folder: str) -> list[str]:
+        """Get the command line that opens a workspace folder in VS Code"""
+        window_flag = {"new": ["--new-window"], "reuse": ["--reuse-window"]}.get(settings.window_mode, [])
+        return [settings.exe_path, *window_flag, workspace_folder]
+
+    @classmethod
+    def vscode_running(cls, exe_path: str) -> bool:
+        """Check whether VS Code (the process for exe_path) is running"""
+        image = path.basename(exe_path.replace("\\", "/"))
+        try:
+            if verify_windows():
+                result = subprocess.run(["tasklist", "/FI", f"IMAGENAME eq {image}", "/NH", "/FO", "CSV"], capture_output=True,
+                                        text=True, timeout=10, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+                return f'"{image.lower()}"' in result.stdout.lower()
+            return subprocess.run(["pgrep", "-x", image], capture_output=True, timeout=10).returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            return False
+
+    @classmethod
+    def vscode_server_running(cls) -> bool:
+        """Check whether VS Code Server (Remote - SSH, WSL or a tunnel) is running, which runs as 'node' instead of exe_path"""
+        if verify_windows():
+            return False
+        try:
+            # The server's node runs from ~/.vscode-server/bin/<commit> (or from cli/servers/... for newer servers)
+            return subprocess.run(["pgrep", "-f", r"\.vscode-server[^/]*/(bin|cli)/"], capture_output=True, timeout=10).returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            return False
+
+    def list_names(self, workspaces: Sequence[Workspace]) -> list[str]:
+        """Get the names shown in the list: the display names, marking heavy workspaces when show_weight is true"""
+        names = WorkspaceLocator.display_names(workspaces)
+        if not self._weights:
+            return names
+        # Snapshot rows are marked without creating Workspace objects
+        folders = workspaces.values("workspace") if isinstance(workspaces, WorkspaceSnapshot) else [w.workspace for w in workspaces]
+        return [f"{name}{self._weights.marker(folder)}" for name, folder in zip(names, folders)]
+
+    def show_details(self, selected_workspace: Workspace) -> None:
+        """Show whatever details are available for the selected workspace (missing details load in the background)"""
+        if not self._settings.show_details or not selected_workspace:
+            return
+        summary = self._details_cache.get(selected_workspace).summary
+        if self._weights and selected_workspace.exists:
+            # A missing or stale weight is analyzed in the background and shown once it is ready
+            self._weights.analyze_later(selected_workspace, lambda w, _: self.window.write_event_value("-DETAILS-", w))
+            weight = self._weights.get(selected_workspace.workspace)
+            summary += f"\n{weight.summary(self._settings.weight_heavy_files) if weight else 'Weight:      analyzing...'}"
+        self.details_text.update(summary)
+
+    def launch_workspaces(self, workspaces: list[Workspace]) -> None:
+        """Open several workspaces in VS Code in the background, sending a -BATCH- event as each launch finishes"""
+        threading.Thread(target=self._launch_batch, args=(list(workspaces),), daemon=True).start()
+
+    def _launch_batch(self, workspaces: list[Workspace]) -> None:
+        """Launch the workspaces through a bounded pool, pacing the creation of VS Code windows"""
+        if self._settings.prewarm_vscode:
+            # Every launch in the batch should hand off to a running instance instead of becoming the main VS Code process
+            self.prewarm_vscode()
+        with ThreadPoolExecutor(max_workers=self._settings.batch_concurrency) as pool:
+            for index, workspace in enumerate(workspaces):
+                if index:
+                    time.sleep(self._settings.batch_delay)
+                future = pool.submit(self._run_vscode, workspace)
+                future.add_done_callback(lambda f, w=workspace: self.window.write_event_value("-BATCH-", (w, f.result())))
+
+    def _run_vscode(self, workspace: Workspace) -> str:
+        """Run VS Code for a workspace and wait briefly for it to fail (returns an error message if the launch failed)"""
+        # Errors go to a temporary file so a process that keeps running can never block on a full pipe
+        with tempfile.TemporaryFile() as errors:
+            try:
+                process = subprocess.Popen(WorkspaceLauncher.vscode_args(self._settings, workspace.workspace),
+                                           stdout=subprocess.DEVNULL, stderr=errors)
+            except OSError as e:
+                return str(e)
+            try:
+                returncode = process.wait(timeout=WorkspaceLauncher.launch_wait)
+            except subprocess.TimeoutExpired:
+                # This launch became the main VS Code process (never kill it, it owns the new window)
+                return None
+            if returncode:
+                errors.seek(0)
+                return errors.read().decode(errors="replace").strip() or f"VS Code exited with code {returncode}"
+        return None
 
     def launch_repository(self, selected_workspace: Workspace):
         """Open the repository (if one exists) for the selected workspace in the default browser"""
         # Get the workspace Identified by the display name
         if selected_workspace.repo_uri:
-            # Open the browser to the repository
-            webbrowser.open(selected_workspace.repo_uri)
+            # Open the browser to the repository (SSH remotes are opened as their HTTPS page)
+            webbrowser.open(selected_workspace.repo_url)
         
     def resource_path(self, file_name: str) -> str:
         """Fix for issue with PyInstaller not respecting the icon"""
@@ -377,40 +3226,560 @@ class WorkspaceLauncher:
     #endregion
 #endregion
 
+#region WorkspaceQuickPick
+class WorkspaceQuickPick(WorkspaceLauncher):
+    """Keyboard-first UI showing the best matches for the typed text (Enter launches the highlighted workspace)"""
+
+    #region Constructor
+    def __init__(self, settings: WorkspaceSettings=None, settings_file: str=None) -> None:
+        """Initialize"""
+        self._init_launcher(settings, settings_file)
+
+        # UI Controls:
+        text = (self._settings.font, self._settings.font_size)
+        # Text box for the user to type the workspace they are looking for
+        self.workspace_query = sg.InputText(
+            enable_events=True,
+            font=text,
+            size=(80, 1),
+            key="-QUERY-"
+        )
+        # Best matches for the query (only the top few are ever put in the list)
+        self.results_list = sg.Listbox(
+            values=[],
+            enable_events=True,
+            font=text,
+            size=(80, self._settings.quick_pick_size),
+            no_scrollbar=True,
+            select_mode=sg.LISTBOX_SELECT_MODE_SINGLE,
+            key="-RESULTS-"
+        )
+        # UI window layout
+        self.window_layout = [
+            [self.workspace_query],
+            [self.results_list]
+        ]
+        # UI Window
+        self.window = sg.Window(
+            title="Workspace Launcher for Visual Studio Code",
+            icon=self.resource_path("rocket.ico"),
+            layout=self.window_layout,
+            margins=(0, 0),
+            enable_close_attempted_event=self.resident,
+            finalize=True
+        )
+        self._start_window()
+        # Navigation keys are handled while the focus stays in the text box
+        self.workspace_query.bind("<Return>", "ENTER")
+        self.workspace_query.bind("<Down>", "DOWN")
+        self.workspace_query.bind("<Up>", "UP")
+        self.window.bind("<Escape>", "-ESCAPE-")
+        self.workspace_query.set_focus()
+        self._results: list[Workspace] = []
+        self._index = 0
+    #endregion
+
+    #region GUI Execution
+    def create_ui(self) -> None:
+        """Generate and launch the GUI"""
+        self.on_query_change("")
+
+        # Run the UI until the user launches a workspace or closes the window
+        while True:
+            # Listen for events
+            event, values = self.window.read()
+
+            if event == sg.WIN_CLOSED or (event == "-ESCAPE-" and not self.resident):
+                # Halt processing if the user closes the UI
+                break
+
+            if event in (sg.WINDOW_CLOSE_ATTEMPTED_EVENT, "-ESCAPE-"):
+                # Staying resident: hide the window until the launcher is started again
+                self.window.hide()
+
+            if event == "-SHOW-":
+                # The launcher was started again: show the window with a cleared query
+                self.on_show()
+
+            if event == "-QUERY-":
+                # Show the best matches for the new text
+                self.on_query_change(values["-QUERY-"])
+
+            if event in ("-QUERY-DOWN", "-QUERY-UP"):
+                # Move the highlight through the results
+                self.on_move(1 if event == "-QUERY-DOWN" else -1)
+
+            if event == "-RESULTS-" and self.results_list.get_indexes():
+                # Clicking a result highlights it and launches it
+                self._index = self.results_list.get_indexes()[0]
+                event = "-QUERY-ENTER"
+
+            if event == "-QUERY-ENTER" and self._results:
+                # Launch the highlighted workspace and get out of the way
+                self.launch_workspace(self._results[self._index])
+                if not self.resident:
+                    # The prefetch carries on in its own process once the window is gone
+                    if self._prefetcher:
+                        self._prefetcher.detach(self._results[self._index])
+                    break
+                self.window.hide()
+
+            if event == "-REFRESH-":
+                # The background refresh changed a workspace, so rank the matches again
+                self.on_query_change(values["-QUERY-"])
+
+        self._close_window()
+    #endregion
+
+    #region Event handlers
+    def on_query_change(self, query: str) -> None:
+        """Replace the results with the best matches for the query"""
+        self._results = self._workspace_locator.rank(query, self._settings.quick_pick_size)
+        self._index = 0
+        self.results_list.update(values=self.list_names(self._results), set_to_index=0 if self._results else None)
+        self.prefetch_highlighted()
+
+    def on_show(self) -> None:
+        """Show the window with a cleared query and give it the focus (when the launcher is started again)"""
+        self.window.un_hide()
+        self.window.bring_to_front()
+        self.workspace_query.update("")
+        self.on_query_change("")
+        self.window.force_focus()
+        self.workspace_query.set_focus()
+
+    def on_move(self, step: int) -> None:
+        """Move the highlight up or down the results"""
+        if not self._results:
+            return
+        self._index = (self._index + step) % len(self._results)
+        self.results_list.update(set_to_index=self._index, scroll_to_index=self._index)
+        self.prefetch_highlighted()
+
+    def prefetch_highlighted(self) -> None:
+        """Start prefetching the highlighted workspace, so its files are cached by the time Enter is pressed"""
+        if self._prefetcher and self._results:
+            self._prefetcher.start(self._results[self._index])
+    #endregion
+#endregion
+
+#region WorkspaceTree
+class WorkspaceTree(WorkspaceLauncher):
+    """Tree UI grouping the workspaces by parent folder or repository host (a group's workspaces are added when it is expanded)"""
+
+    #region Constructor
+    def __init__(self, settings: WorkspaceSettings=None, settings_file: str=None) -> None:
+        """Initialize"""
+        self._init_launcher(settings, settings_file)
+
+        # UI Controls:
+        text = (self._settings.font, self._settings.font_size)
+        # Text box for the user to type a filter for the workspaces
+        self.workspace_filter = sg.InputText(
+            enable_events=True,
+            font=text,
+            key="-FILTER-"
+        )
+        # Checkbox to indicate whether to launch the workspace in VS Code
+        self.vsc_toggle = sg.Checkbox(
+            text="Open in VS Code",
+            default=True,
+            key="-VSC-"
+        )
+        # Checkbox to indicate whether to launch the repo URL in a browser
+        self.url_toggle = sg.Checkbox(
+            text="Launch repo URL",
+            default=False,
+            key="-URL-"
+        )
+        # Groups of workspaces (only the group nodes exist until a group is expanded)
+        self.workspace_tree = sg.Tree(
+            data=sg.TreeData(),
+            headings=[],
+            font=text,
+            col0_width=80,
+            num_rows=20,
+            show_expanded=False,
+            enable_events=True,
+            select_mode=sg.TABLE_SELECT_MODE_BROWSE,
+            key="-TREE-"
+        )
+        # UI window layout
+        self.window_layout = [
+            [sg.Text("Filter:", font=text), self.workspace_filter, self.vsc_toggle, self.url_toggle],
+            [self.workspace_tree]
+        ]
+        # UI Window
+        self.window = sg.Window(
+            title="Workspace Launcher for Visual Studio Code",
+            icon=self.resource_path("rocket.ico"),
+            layout=self.window_layout,
+            margins=(0, 0),
+            enable_close_attempted_event=self.resident,
+            finalize=True
+        )
+        self._start_window()
+        # Expanding a group adds its workspaces, and double-click or Enter launches the selected workspace
+        self.workspace_tree.bind("<<TreeviewOpen>>", "OPEN")
+        self.workspace_tree.bind("<Double-1>", "LAUNCH")
+        self.workspace_tree.bind("<Return>", "LAUNCH")
+        # Workspaces currently in the tree, their groups ({group: positions}) and the groups already expanded
+        self._workspaces: Sequence[Workspace] = []
+        self._groups: dict[str, list[int]] = {}
+        self._expanded: set[str] = set()
+    #endregion
+
+    #region GUI Execution
+    def create_ui(self) -> None:
+        """Generate and launch the GUI"""
+        filter_text = ""
+        self.on_filter_change(filter_text)
+
+        # Run the UI until the user closes the window
+        while True:
+            # Listen for events
+            event, values = self.window.read()
+
+            if event == sg.WIN_CLOSED:
+                # Halt processing if the user closes the UI
+                break
+
+            if event == sg.WINDOW_CLOSE_ATTEMPTED_EVENT:
+                # Staying resident: hide the window until the launcher is started again
+                self.window.hide()
+
+            if event == "-SHOW-":
+                # The launcher was started again: show the window with a cleared filter
+                filter_text = ""
+                self.on_show()
+
+            if event == "-FILTER-" and values["-FILTER-"] != filter_text:
+                # Regroup the workspaces matching the new filter text
+                filter_text = values["-FILTER-"]
+                self.on_filter_change(filter_text)
+
+            if event == "-TREE-OPEN":
+                # Add the workspaces of the group being expanded
+                self.on_expand()
+
+            if event == "-TREE-LAUNCH":
+                # Launch the selected workspace
+                self.on_launch(values["-TREE-"])
+
+            if event == "-REFRESH-":
+                # The background refresh changed a workspace, so rebuild the groups
+                self.on_filter_change(filter_text)
+
+        self._close_window()
+    #endregion
+
+    #region Event handlers
+    def on_filter_change(self, filter_text: str) -> None:
+        """Show the groups of the workspaces matching the filter text (collapsed, with no workspaces added yet)"""
+        if filter_text:
+            self._workspaces = self._workspace_locator.find(filter_text)
+            self._groups = WorkspaceLocator.group_workspaces(self._workspaces, self._settings.tree_group_by)
+        else:
+            self._workspaces, self._groups = self._workspace_locator.group_index(self._settings.tree_group_by)
+        self._expanded = set()
+        data = sg.TreeData()
+        for group, positions in self._groups.items():
+            data.insert("", ("group", group), f"{group} ({len(positions)})", [])
+            # Placeholder so the group can be expanded before its workspaces are added
+            data.insert(("group", group), ("placeholder", group), "", [])
+        self.workspace_tree.update(values=data)
+
+    def on_show(self) -> None:
+        """Show the window with a cleared filter and give it the focus (when the launcher is started again)"""
+        self.window.un_hide()
+        self.window.bring_to_front()
+        self.workspace_filter.update("")
+        self.on_filter_change("")
+        self.window.force_focus()
+        self.workspace_filter.set_focus()
+
+    def on_expand(self) -> None:
+        """Replace the placeholder of the expanded group with its workspaces (once per filter)"""
+        tree = self.workspace_tree.Widget
+        key = self.workspace_tree.IdToKey.get(tree.focus())
+        if not key or key[0] != "group" or key[1] in self._expanded:
+            return
+        self._expanded.add(key[1])
+        group_id = self.workspace_tree.KeyToID[key]
+        tree.delete(*tree.get_children(group_id))
+        for position in self._groups[key[1]]:
+            node_id = tree.insert(group_id, "end", text=self.node_text(self._workspaces[position]))
+            self.workspace_tree.KeyToID[("workspace", position)] = node_id
+            self.workspace_tree.IdToKey[node_id] = ("workspace", position)
+
+    def on_launch(self, selected_keys: list[tuple[str, any]]) -> None:
+        """Launch the selected workspace in VS Code and/or its repository in the browser (groups are ignored)"""
+        if not selected_keys or selected_keys[0][0] != "workspace":
+            return
+        self.on_workspace_select(self._workspaces[selected_keys[0][1]])
+    #endregion
+
+    #region Helper Functions
+    def node_text(self, workspace: Workspace) -> str:
+        """Get the text of a workspace node (the parent is left out when it is already the group)"""
+        marker = self._weights.marker(workspace.workspace) if self._weights else ""
+        if self._settings.tree_group_by == "parent":
+            return workspace.display_name.split(" > ", 1)[-1] + marker
+        return workspace.display_name + marker
+    #endregion
+#endregion
+
+#region WorkspaceTerminal
+class WorkspaceTerminal:
+    """Terminal UI (curses) with live filtering and arrow-key selection, for SSH sessions and fast starts"""
+
+    #region Constructor
+    def __init__(self, settings: WorkspaceSettings=None, settings_file: str=None) -> None:
+        """Initialize"""
+        self._settings = settings
+        if not self._settings:
+            self._settings = WorkspaceSettings.from_file(settings_file) if settings_file else WorkspaceSettings()
+        self._workspace_locator = WorkspaceLocator(self._settings)
+        self._query = ""
+        self._matches: Sequence[Workspace] = self._workspace_locator.workspaces
+        self._index = 0
+        self._top = 0
+    #endregion
+
+    #region GUI Execution
+    def create_ui(self) -> None:
+        """Run the terminal UI, then launch the chosen workspace once the terminal is restored"""
+        if curses is None:
+            exit("The terminal UI needs the curses module (pip install windows-curses on Windows)")
+        selected_workspace = curses.wrapper(self._run)
+        if selected_workspace:
+            error = self.launch_workspace(selected_workspace)
+            if error:
+                exit(error)
+
+    def _run(self, screen: "curses.window") -> Workspace:
+        """Handle keys until a workspace is chosen (returned) or the user quits (None)"""
+        curses.curs_set(0)
+        while True:
+            self.draw(screen)
+            try:
+                key = screen.get_wch()
+            except curses.error:
+                continue
+            if key in ("\x1b", "\x03"):
+                # Escape or Ctrl+C
+                return None
+            if key in ("\n", "\r", curses.KEY_ENTER):
+                if self._matches:
+                    return self._matches[self._index]
+            elif key in (curses.KEY_UP, curses.KEY_DOWN, curses.KEY_PPAGE, curses.KEY_NPAGE):
+                page = max(1, screen.getmaxyx()[0] - 2)
+                self.on_move({curses.KEY_UP: -1, curses.KEY_DOWN: 1, curses.KEY_PPAGE: -page, curses.KEY_NPAGE: page}[key])
+            elif key in (curses.KEY_BACKSPACE, "\x7f", "\b"):
+                self.on_query_change(self._query[:-1])
+            elif key == "\x15":
+                # Ctrl+U clears the query
+                self.on_query_change("")
+            elif isinstance(key, str) and key.isprintable():
+                self.on_query_change(self._query + key)
+    #endregion
+
+    #region Event handlers
+    def on_query_change(self, query: str) -> None:
+        """Show the workspaces matching the new query (same query language as the filter box)"""
+        self._query = query
+        self._matches = self._workspace_locator.find(query)
+        self._index = 0
+        self._top = 0
+
+    def on_move(self, step: int) -> None:
+        """Move the highlight through the matches (stopping at either end)"""
+        if self._matches:
+            self._index = min(max(self._index + step, 0), len(self._matches) - 1)
+    #endregion
+
+    #region Helper Functions
+    def draw(self, screen: "curses.window") -> None:
+        """Draw the query line, the visible matches and the status line"""
+        height, width = screen.getmaxyx()
+        rows = max(1, height - 2)
+        # Keep the highlighted match on screen
+        self._top = min(max(self._top, self._index - rows + 1), self._index)
+        screen.erase()
+        self._write(screen, 0, f"> {self._query}", width, curses.A_BOLD)
+        visible = self._matches[self._top:self._top + rows]
+        for row, workspace in enumerate(visible, start=1):
+            self._write(screen, row, workspace.display_name, width, curses.A_REVERSE if self._top + row - 1 == self._index else 0)
+        self._write(screen, height - 1, f"{len(self._matches)} of {len(self._workspace_locator.workspaces)}  "
+                                         "Enter: open  Up/Down/PgUp/PgDn: move  Ctrl+U: clear  Esc: quit", width, curses.A_DIM)
+        screen.refresh()
+
+    def launch_workspace(self, selected_workspace: Workspace) -> str:
+        """Open a workspace with the VS Code command line (returns an error message, or None)"""
+        try:
+            subprocess.run(WorkspaceLauncher.vscode_args(self._settings, selected_workspace.workspace), check=False)
+        except OSError as e:
+            return f"Could not start {self._settings.exe_path}: {e}"
+        return None
+
+    @classmethod
+    def _write(cls, screen: "curses.window", row: int, text: str, width: int, attributes: int) -> None:
+        """Write one line, cut to the screen width (the last column is left empty so the screen never scrolls)"""
+        try:
+            screen.addnstr(row, 0, text, max(0, width - 1), attributes)
+        except curses.error:
+            pass
+    #endregion
+#endregion
+
 #region WorkspaceProgram
 #region Helper Functions
 def verify_windows() -> bool:
     """Check that this is a Windows PC"""
     return platform.system() == "Windows"
 
-def get_settings(json_path: str) -> WorkspaceSettings:
-    """Read the settings.json file and load settings"""
+def import_gui() -> None:
+    """Import PySimpleGUI as sg (only the windows and alerts need it)"""
+    global sg
+    if sg is None:
+        import PySimpleGUI
+        sg = PySimpleGUI
+
+def get_settings(json_path: str, check_storage: bool=True) -> WorkspaceSettings:
+    """Read the settings.json file and load settings (raises SettingsError if the file is not valid)"""
     if not path.isfile(json_path):
         return None
-    print(json_path)
-    settings_dict = json.loads(Path(json_path).read_text())
-    try:
-        return WorkspaceSettings.from_dict(settings_dict)
-    except:
-        return None
+    return WorkspaceSettings.from_file(json_path, check_storage=check_storage)
 
 def unsupported_os_alert(suppress_alert: bool=False) -> str:
     """Display an alert window if not running Windows"""
     ops = platform.system()
     if not suppress_alert:
-        sg.popup_ok(f"Your OS ({ops}) is not yet supported by this application.")
+        import_gui()
+        sg.popup_ok(f"Your OS ({ops}) is not yet supported by this application (try the terminal UI: --tui).")
     return f"Unsupported OS: {ops}"
+
+def settings_error_alert(error: SettingsError, suppress_alert: bool=False) -> str:
+    """Display an alert window if the settings file is not valid"""
+    if not suppress_alert:
+        import_gui()
+        sg.popup_error(f"The settings are not valid:\n{error}", title="Workspace Launcher for Visual Studio Code")
+    return f"Invalid settings: {error}"
 #endregion
 
 #region Main Function
+def parse_args(args: list[str]=None) -> argparse.Namespace:
+    """Parse the command line"""
+    parser = argparse.ArgumentParser(description="Select and launch VS Code workspaces")
+    parser.add_argument("settings", nargs="?", default="settings.json", help="settings JSON file")
+    parser.add_argument("--export", metavar="FILE", help="write the workspace list to FILE ('-' for standard output) instead of showing the UI")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl", help="export format (default: jsonl)")
+    parser.add_argument("--tui", action="store_true", help="use the terminal UI (e.g. over SSH) instead of the window")
+    parser.add_argument("--compact", action="store_true", help="checkpoint and vacuum the VS Code state databases and report the bytes reclaimed")
+    parser.add_argument("--weigh", action="store_true", help="analyze how heavy each workspace is for VS Code and suggest exclude settings")
+    parser.add_argument("--all-users", action="store_true",
+                        help="scan the workspaces of every user profile on the machine and report them per user (with --export: export them)")
+    parser.add_argument("--prefetch", metavar="FOLDER", help="read the source files of a workspace folder into the file cache (started by the quick pick)")
+    return parser.parse_args(args)
+
+def export_workspaces(settings: WorkspaceSettings, export_file: str, format: str) -> int:
+    """Stream the workspace list to a file (or standard output) without showing the UI"""
+    locator = WorkspaceLocator(settings=settings, load=False) if settings else WorkspaceLocator(load=False)
+    if export_file == "-":
+        return locator.export(sys.stdout, format)
+    with open(export_file, "w", encoding="utf-8", newline="") as f:
+        return locator.export(f, format)
+
+def compact_workspaces(settings: WorkspaceSettings, output: TextIO=sys.stdout) -> int:
+    """Compact the state databases of the existing workspaces, report the bytes reclaimed per workspace and return the total"""
+    locator = WorkspaceLocator(settings=settings, load=False) if settings else WorkspaceLocator(load=False)
+    if WorkspaceLauncher.vscode_running(locator._settings.exe_path) or WorkspaceLauncher.vscode_server_running():
+        output.write("VS Code is running: close it (and any VS Code Server) to compact the state databases of its workspaces\n")
+        return 0
+    compacted = locator.compact_state(locator.iter_workspaces())
+    for workspace, reclaimed in sorted(compacted.items(), key=lambda item: -item[1]):
+        output.write(f"{reclaimed:>14,} {workspace}\n")
+    total = sum(compacted.values())
+    output.write(f"{total:>14,} bytes reclaimed from {len(compacted)} workspaces\n")
+    return total
+
+def weigh_workspaces(settings: WorkspaceSettings, output: TextIO=sys.stdout) -> int:
+    """Analyze the existing workspaces, report them heaviest first with suggested exclude settings and return the number analyzed"""
+    settings = settings or WorkspaceSettings()
+    locator = WorkspaceLocator(settings=settings, load=False)
+    weights = WorkspaceWeightAnalyzer(settings).analyze(locator.iter_workspaces())
+    for folder, weight in sorted(weights.items(), key=lambda item: -item[1].files):
+        output.write(f"{weight.level(settings.weight_heavy_files):<6} {weight.files:>10,}{' ' if weight.exact else '+'} files "
+                     f"{WorkspaceDetails.format_size(weight.size):>10} {folder}\n")
+        excludes = weight.suggest_excludes(settings.weight_heavy_files // 10)
+        if excludes and weight.level(settings.weight_heavy_files) != "light":
+            output.write(f"       Suggested settings: {json.dumps(excludes)}\n")
+    return len(weights)
+
+def prefetch_workspace(settings: WorkspaceSettings, folder: str) -> int:
+    """Read the source files of a workspace folder into the file cache and return the number of bytes read ahead"""
+    return WorkspacePrefetcher(settings or WorkspaceSettings()).prefetch(folder)
+
+def inventory_workspaces(settings: WorkspaceSettings, export_file: str=None, format: str="jsonl", output: TextIO=sys.stdout) -> WorkspaceInventory:
+    """Scan every user profile and write a line per user, or export the workspaces of every user to a file ("-" for output)"""
+    settings = settings or WorkspaceSettings()
+    inventory = WorkspaceInventory(settings)
+    inventory.scan()
+    if not export_file:
+        inventory.report(output)
+    elif export_file == "-":
+        WorkspaceLocator(settings=settings, load=False).export(output, format, inventory.workspaces)
+    else:
+        with open(export_file, "w", encoding="utf-8", newline="") as f:
+            WorkspaceLocator(settings=settings, load=False).export(f, format, inventory.workspaces)
+    return inventory
+
 def main() -> None:
     """Get settings from JSON file and run the WorkspaceLauncher"""
-    if not verify_windows():
+    args = parse_args()
+    # The terminal UI and the reports work everywhere (and without a display), the window only on Windows
+    windowless = bool(args.tui or args.export or args.compact or args.weigh or args.all_users or args.prefetch)
+    if not verify_windows() and not windowless:
         exit(unsupported_os_alert())
-    settings_path = file_path(sys.argv[1] if len(sys.argv) > 1 else "settings.json")
-    settings = get_settings(settings_path)
-    launcher = WorkspaceLauncher(settings=settings) if settings else WorkspaceLauncher()
-    launcher.create_ui()
+    settings_path = file_path(args.settings)
+    try:
+        # The inventory scans every profile but the caller's own, so it runs even if the caller has never used VS Code
+        settings = get_settings(settings_path, check_storage=not args.all_users)
+    except SettingsError as e:
+        # Without a window the error only goes to standard error
+        exit(settings_error_alert(e, suppress_alert=windowless))
+    if args.all_users:
+        inventory_workspaces(settings, args.export, args.format)
+        return
+    if args.export:
+        export_workspaces(settings, args.export, args.format)
+        return
+    if args.compact:
+        compact_workspaces(settings)
+        return
+    if args.weigh:
+        weigh_workspaces(settings)
+        return
+    if args.prefetch:
+        prefetch_workspace(settings, args.prefetch)
+        return
+    if args.tui:
+        terminal = WorkspaceTerminal(settings=settings) if settings else WorkspaceTerminal()
+        terminal.create_ui()
+        return
+    instance = WorkspaceInstance(settings) if settings and settings.single_instance else None
+    if instance and not instance.acquire() and instance.signal():
+        # The running launcher is showing its window (if it didn't answer, this one runs without the lock)
+        return
+    launcher_class = {"quick_pick": WorkspaceQuickPick, "tree": WorkspaceTree}.get(settings.ui_mode if settings else None, WorkspaceLauncher)
+    launcher = launcher_class(settings=settings, settings_file=settings_path) if settings else launcher_class()
+    if instance:
+        instance.serve(lambda: launcher.window.write_event_value("-SHOW-", None))
+    try:
+        launcher.create_ui()
+    finally:
+        if instance:
+            instance.close()
 #endregion
 
 #region Main Guard
@@ -426,11 +3795,59 @@ if __name__ == "__main__":
 #     "username": "default",
 #     "hide_missing": true,
 #     "clean_up_orphans": false,
+#     "clean_up_duplicates": false,
+#     "compact_state": false,
 #     "show_repos": true,
 #     "font": "CaskaydiaCove Nerd Font",
 #     "font_size": 10,
 #     "show_glyphs": true,
 #     "x_location": 10,
-#     "y_location": -160
+#     "y_location": -160,
+#     "max_concurrency": 16,
+#     "io_timeout": 5.0,
+#     "batch_concurrency": 2,
+#     "batch_delay": 1.0,
+#     "show_details": true,
+#     "details_ttl": 30.0,
+#     "size_ttl": 600.0,
+#     "sort_by": "name",
+#     "data_path": "default",
+#     "use_snapshot": false,
+#     "ui_mode": "combo",
+#     "quick_pick_size": 10,
+#     "prewarm_vscode": false,
+#     "window_mode": "default",
+#     "tree_group_by": "parent",
+#     "single_instance": false,
+#     "stay_resident": false,
+#     "instance_port": 0,
+#     "source_roots": [],
+#     "source_depth": 3,
+#     "source_skip": ["node_modules", ".venv", "venv", "env", "__pycache__", ".tox", ".mypy_cache", "bin", "obj", "build", "dist", "target", ".idea", ".vs", ".vscode"],
+#     "orphan_min_scans": 3,
+#     "orphan_min_days": 7.0,
+#     "compact_concurrency": 2,
+#     "prefetch": false,
+#     "prefetch_max_mb": 256.0,
+#     "prefetch_file_mb": 1.0,
+#     "prefetch_mb_per_second": 64.0,
+#     "show_weight": false,
+#     "weight_heavy_files": 20000,
+#     "weight_ttl": 7.0,
+#     "profile_concurrency": 4,
+#     "profile_rate": 50.0,
+#     "profile_budget": 60.0,
+#     "providers": ["folder"],
+#     "provider_timeout": 10.0,
+#     "background_refresh": false,
+#     "refresh_budget": 8,
+#     "refresh_min_interval": 60.0,
+#     "refresh_max_interval": 3600.0,
+#     "repo_hosts": {
+#         "github": "github\\.com",
+#         "gitlab": "gitlab\\.",
+#         "bitbucket": "bitbucket\\.org",
+#         "azure": "dev\\.azure\\.com|\\.visualstudio\\.com"
+#     }
 # }
 #endregion
@@ -1,7 +1,20 @@
 """Test Functions for project.py"""
 
+import asyncio
+import io
+import json
+import os
 import platform
-from project import verify_windows, get_settings, unsupported_os_alert, WorkspaceSettings, Workspace, WorkspaceLocator
+import sqlite3
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+from project import verify_windows, get_settings, unsupported_os_alert, settings_error_alert, SettingsError, WorkspaceSettings, Workspace, WorkspaceLocator, AsyncWorkspaceLocator, \
+    WorkspaceLauncher, WorkspaceQuickPick, WorkspaceTree, \
+    WorkspaceDetails, WorkspaceDetailsCache, VSCodeState, WorkspaceSnapshot, WorkspaceRefreshScheduler, WorkspaceInstance, WorkspaceTerminal, \
+    WorkspaceStore, WorkspacePrefetcher, WorkspaceWeightAnalyzer, WorkspaceInventory, WorkspaceProvider, JetBrainsProvider, DaemonThreadPool, \
+    compact_workspaces
 import pytest
 
 # Dev Note: Make sure all fixtures exist on the current workstation
@@ -25,6 +38,68 @@ def test_unsupported_os_alert():
     """Test the unsupported_os_alert function"""
     assert unsupported_os_alert(suppress_alert=True) == f"Unsupported OS: {platform.system()}"
 
+def test_settings_error_alert():
+    """Test the settings_error_alert function"""
+    assert settings_error_alert(SettingsError("bad"), suppress_alert=True) == "Invalid settings: bad"
+
+def test_windowless_settings_error(tmp_path: Path):
+    """Test that the modes without a window report settings errors on standard error without loading PySimpleGUI"""
+    import subprocess
+    import sys
+    settings_file = tmp_path / "settings.json"
+    settings_file.write_text('{"font_size": "large"}')
+    project_file = str(Path(__file__).with_name("project.py"))
+    result = subprocess.run([sys.executable, project_file, str(settings_file), "--export", "-"], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 1
+    assert result.stderr.startswith("Invalid settings:") and result.stdout == ""
+    loaded = subprocess.run([sys.executable, "-c", "import sys, project; print('PySimpleGUI' in sys.modules)"], cwd=Path(project_file).parent,
+                            capture_output=True, text=True, timeout=60)
+    assert loaded.stdout.strip() == "False"
+
+"""Test functions for the WorkspaceSettings Class"""
+
+def test_validate_settings():
+    """Test that invalid settings are rejected with every problem listed"""
+    WorkspaceSettings.validate({"font_size": 12, "io_timeout": 2, "show_repos": False})
+    with pytest.raises(SettingsError) as e:
+        WorkspaceSettings.validate({"fontsize": 12, "font_size": "12", "hide_missing": 1, "max_concurrency": 0})
+    assert "unknown setting 'fontsize'" in str(e.value)
+    assert "'font_size' must be of type int" in str(e.value)
+    assert "'hide_missing' must be of type bool" in str(e.value)
+    assert "'max_concurrency' must be greater than 0" in str(e.value)
+
+def test_from_file_cached(tmp_path: Path):
+    """Test that a settings file is parsed once until it changes"""
+    settings_file = tmp_path / "settings.json"
+    settings_file.write_text(json.dumps({"username": "tester", "workspace_path": str(tmp_path), "font_size": 12}))
+    settings = WorkspaceSettings.from_file(str(settings_file))
+    assert settings.font_size == 12
+    cached = WorkspaceSettings.from_file(str(settings_file))
+    assert cached == settings and cached is not settings
+    settings.font_size = 20
+    settings.source_roots.append(str(tmp_path))
+    settings.repo_hosts["example"] = "example"
+    cached = WorkspaceSettings.from_file(str(settings_file))
+    assert cached.font_size == 12 and cached.source_roots == [] and "example" not in cached.repo_hosts
+    settings_file.write_text("{ not json")
+    os.utime(settings_file, (time.time() + 10, time.time() + 10))
+    with pytest.raises(SettingsError):
+        WorkspaceSettings.from_file(str(settings_file))
+
+def test_from_dict_missing_workspace_path(tmp_path: Path):
+    """Test that a workspace path that doesn't exist is reported"""
+    with pytest.raises(SettingsError):
+        WorkspaceSettings.from_dict({"username": "tester", "workspace_path": str(tmp_path / "missing")})
+
+def test_from_file_unchecked_storage(tmp_path: Path):
+    """Test that the inventory of every profile loads settings whose own workspace path doesn't exist"""
+    settings_file = tmp_path / "settings.json"
+    settings_file.write_text(json.dumps({"username": "tester", "workspace_path": str(tmp_path / "missing")}))
+    assert get_settings(str(settings_file), check_storage=False).workspace_path == str(tmp_path / "missing")
+    # The check still applies to the cached settings
+    with pytest.raises(SettingsError):
+        get_settings(str(settings_file))
+
 """Test functions for the Workspace Class"""
 
 # Dev Note: Make sure all fixtures exist on the current workstation
@@ -129,6 +204,50 @@ def test_from_invalid_ws_folder():
     w = Workspace.from_workspace_folder("C:\\Invalid\\Folder\\Path")
     assert w is None
 
+def test_parse_repo_uri():
+    """Test that the origin remote is preferred over other URLs in a git config"""
+    git_config = "\n".join([
+        '[url "https://mirror.example.com/"]',
+        '\tinsteadOf = https://example.com/',
+        '[remote "upstream"]',
+        '\turl = https://github.com/upstream/project',
+        '[remote "origin"]',
+        '\turl = https://github.com/origin/project?x=1',
+    ])
+    assert Workspace.parse_repo_uri(git_config) == "https://github.com/origin/project?x=1"
+    assert Workspace.parse_repo_uri('[remote "upstream"]\n\turl = git@github.com:u/p.git') == "git@github.com:u/p.git"
+    assert Workspace.parse_repo_uri("[core]\n\tbare = false") is None
+
+def test_repo_hosts():
+    """Test classifying repository hosts and converting SSH remotes to browsable URLs"""
+    assert Workspace.classify_repo_host("git@github.com:org/repo.git") == "github"
+    assert Workspace.classify_repo_host("https://dev.azure.com/org/project/_git/repo") == "azure"
+    assert Workspace.classify_repo_host("https://git.example.com/org/repo") == "self-hosted"
+    assert Workspace.classify_repo_host("https://git.example.com/org/repo", {"gitlab": r"git\.example\.com"}) == "gitlab"
+    assert Workspace.classify_repo_host(None) is None
+    assert Workspace.browse_url("git@github.com:org/repo.git") == "https://github.com/org/repo"
+    assert Workspace.browse_url("ssh://git@gitlab.example.com:2222/group/repo.git") == "https://gitlab.example.com/group/repo"
+    assert Workspace.browse_url("git@ssh.dev.azure.com:v3/org/project/repo") == "https://dev.azure.com/org/project/_git/repo"
+    assert Workspace.browse_url("https://user@bitbucket.org/team/repo.git") == "https://bitbucket.org/team/repo"
+    workspace = Workspace(repo_uri="git@github.com:org/repo.git", repo_host="github", show_glyph=True)
+    assert f"| {Workspace.host_glyphs['github']} git@github.com" in workspace.display_name
+    with pytest.raises(SettingsError):
+        WorkspaceSettings.validate({"repo_hosts": {"broken": "("}})
+
+def test_from_ws_folder_worktree(tmp_path: Path):
+    """Test Workspace factory for a git worktree (where .git is a file)"""
+    git_folder = tmp_path / "main" / ".git"
+    (git_folder / "worktrees" / "feature").mkdir(parents=True)
+    (git_folder / "config").write_text('[remote "origin"]\n\turl = https://bitbucket.org/team/project\n')
+    (git_folder / "worktrees" / "feature" / "commondir").write_text("../..\n")
+    worktree = tmp_path / "feature"
+    worktree.mkdir()
+    (worktree / ".git").write_text(f"gitdir: {git_folder / 'worktrees' / 'feature'}\n")
+    w = Workspace.from_workspace_folder(str(worktree))
+    assert w.exists
+    assert w.repo_uri == "https://bitbucket.org/team/project"
+    assert w.repo_uri == Workspace.from_workspace_folder(str(tmp_path / "main")).repo_uri
+
 def test_display_name(defaults: Workspace):
     """Test display name"""
     w = Workspace.from_workspace_folder(defaults.workspace)
@@ -169,3 +288,652 @@ def test_workspaces(settings_path):
     """Test obtaining workspaces"""
     wl = WorkspaceLocator(settings_file=settings_path)
     assert len(wl._workspaces) > 0
+
+def make_vsc_folder(storage: Path, name: str, folder_uri: str) -> str:
+    """Create a VS Code pointer folder containing a workspace.json file"""
+    vsc_folder = storage / name
+    vsc_folder.mkdir(parents=True)
+    (vsc_folder / "workspace.json").write_text(json.dumps({"folder": folder_uri}), encoding="utf-8")
+    return str(vsc_folder)
+
+@pytest.fixture
+def storage_settings(tmp_path: Path) -> WorkspaceSettings:
+    """Settings pointing to an empty temporary workspace storage folder"""
+    storage = tmp_path / "workspaceStorage"
+    storage.mkdir()
+    return WorkspaceSettings(exe_path="code", workspace_path=str(storage), username="tester", hide_missing=False)
+
+def test_duplicate_workspaces(storage_settings: WorkspaceSettings):
+    """Test that VS Code folders pointing to the same workspace folder produce one workspace"""
+    storage = Path(storage_settings.workspace_path)
+    make_vsc_folder(storage, "aaaa", "file:///d%3A/Code/demo")
+    make_vsc_folder(storage, "bbbb", "file:///d%3A/Code/demo/")
+    make_vsc_folder(storage, "cccc", "file:///d%3A/Code/other")
+    wl = WorkspaceLocator(storage_settings)
+    assert len(wl.workspaces) == 2
+    assert len(wl.duplicates) == 1
+    wl.clean_up_duplicates()
+    assert wl.duplicates == []
+    assert len(list(storage.iterdir())) == 2
+    # A duplicate that can't be deleted (here: already gone) doesn't stop the clean up
+    wl._duplicates = [str(storage / "gone")]
+    wl.clean_up_duplicates()
+    assert wl.duplicates == []
+
+def test_orphans_need_repeated_misses(storage_settings: WorkspaceSettings, tmp_path: Path):
+    """Test that a missing workspace folder is only removed after it has been missing for several scans"""
+    storage = Path(storage_settings.workspace_path)
+    storage_settings.data_path = str(tmp_path / "data")
+    storage_settings.orphan_min_scans = 2
+    storage_settings.orphan_min_days = 0
+    wl = WorkspaceLocator(storage_settings)
+    orphan = make_vsc_folder(storage, "aaaa", "file:///d%3A/Code/demo")
+    wl._workspaces = [Workspace(orphan, str(tmp_path / "moved"), "moved", "tmp", None, False)]
+    wl.clean_up_orphans()
+    assert Path(orphan).is_dir()
+    assert len(wl._workspaces) == 1
+    wl.clean_up_orphans()
+    assert not Path(orphan).exists()
+    assert wl._workspaces == []
+
+def test_orphans_on_unreachable_drive(storage_settings: WorkspaceSettings, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that workspaces on an unreachable drive never count as missing"""
+    storage_settings.data_path = str(tmp_path / "data")
+    storage_settings.orphan_min_scans = 1
+    storage_settings.orphan_min_days = 0
+    storage_settings.io_timeout = 0.1
+    wl = WorkspaceLocator(storage_settings)
+    wl._workspaces = [Workspace(str(tmp_path), str(tmp_path / "moved"), "moved", "tmp", None, False)]
+    monkeypatch.setattr(os.path, "isdir", lambda folder: time.sleep(0.5) or True)
+    assert wl.find_orphans() == []
+
+def test_orphans_on_unmounted_share(storage_settings: WorkspaceSettings, tmp_path: Path):
+    """Test that workspaces below a share that isn't mounted (an empty or missing parent folder) never count as missing"""
+    storage_settings.data_path = str(tmp_path / "data")
+    storage_settings.orphan_min_scans = 1
+    storage_settings.orphan_min_days = 0
+    (tmp_path / "mnt" / "share").mkdir(parents=True)
+    (tmp_path / "projects" / "kept").mkdir(parents=True)
+    wl = WorkspaceLocator(storage_settings)
+    wl._workspaces = [Workspace(str(tmp_path / name), str(tmp_path / folder), folder, "tmp", None, False)
+                      for name, folder in [("aaaa", "mnt/share/demo"), ("bbbb", "mnt/nfs/team/demo"), ("cccc", "projects/moved")]]
+    assert [w.vsc_folder for w in wl.find_orphans()] == [str(tmp_path / "cccc")]
+
+def test_compact_state(storage_settings: WorkspaceSettings, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that state databases are vacuumed and that databases in use are skipped"""
+    storage = Path(storage_settings.workspace_path)
+    workspaces = []
+    for name in ("aaaa", "bbbb", "cccc"):
+        vsc_folder = make_vsc_folder(storage, name, f"file:///{name}")
+        with sqlite3.connect(Path(vsc_folder) / "state.vscdb") as db:
+            db.execute("CREATE TABLE ItemTable (key TEXT UNIQUE ON CONFLICT REPLACE, value BLOB)")
+            db.executemany("INSERT INTO ItemTable VALUES (?, ?)", ((str(i), b"x" * 1000) for i in range(200)))
+            db.execute("DELETE FROM ItemTable")
+        db.close()
+        workspaces.append(Workspace(vsc_folder, str(tmp_path), name, "tmp", None, True))
+    Path(workspaces[1].vsc_folder, "state.vscdb-journal").write_bytes(b"")
+    reader = sqlite3.connect(Path(workspaces[2].vsc_folder) / "state.vscdb")
+    reader.execute("BEGIN IMMEDIATE")
+    wl = WorkspaceLocator(storage_settings, load=False)
+    try:
+        compacted = wl.compact_state(workspaces)
+    finally:
+        reader.close()
+    assert list(compacted) == [str(tmp_path)]
+    assert compacted[str(tmp_path)] > 100000
+    assert wl.compacted == compacted
+    assert WorkspaceLocator.compact_database(workspaces[0].vsc_folder) == 0
+    # An open workspace's database isn't locked between writes, so nothing is compacted while VS Code runs
+    monkeypatch.setattr(WorkspaceLauncher, "vscode_running", classmethod(lambda cls, exe_path: True))
+    assert wl.compact_state(workspaces) == {}
+    # VS Code Server runs as node, so it is looked for separately
+    monkeypatch.setattr(WorkspaceLauncher, "vscode_running", classmethod(lambda cls, exe_path: False))
+    monkeypatch.setattr(WorkspaceLauncher, "vscode_server_running", classmethod(lambda cls: True))
+    assert wl.compact_state(workspaces) == {}
+    output = io.StringIO()
+    assert compact_workspaces(storage_settings, output) == 0
+    assert "VS Code Server" in output.getvalue()
+
+def test_inventory(storage_settings: WorkspaceSettings, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test scanning several user profiles into one inventory tagged by user"""
+    alice = tmp_path / "alice"
+    alice.mkdir()
+    make_vsc_folder(alice, "aaaa", (tmp_path / "alice").as_uri())
+    orphan = make_vsc_folder(alice, "bbbb", (tmp_path / "gone").as_uri())
+    Path(orphan, "state.vscdb").write_bytes(b"x" * 500)
+    monkeypatch.setattr(WorkspaceSettings, "for_user", lambda self, user, home=None: replace(self, username=user, workspace_path=str(tmp_path / user)))
+    storage_settings.profile_rate = 1000.0
+    inventory = WorkspaceInventory(storage_settings)
+    profiles = inventory.scan(["alice", "bob"])
+    assert len(profiles["alice"].workspaces) == 2 and profiles["alice"].complete
+    assert profiles["alice"].missing == 1
+    assert profiles["alice"].orphan_bytes >= 500
+    assert not profiles["bob"].complete and profiles["bob"].error
+    assert [w.name for w in inventory.find("user:alice missing:true")] == ["gone"]
+    assert inventory.find("user:bob") == []
+    output = io.StringIO()
+    inventory.report(output)
+    assert output.getvalue().startswith("alice") and "incomplete" in output.getvalue().splitlines()[1]
+    storage_settings.profile_rate, storage_settings.profile_budget = 1.0, 0.5
+    assert not inventory.scan_profile("alice").complete
+
+def test_profile_homes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that user profiles come from the accounts (not the folder names) and skip accounts that can't log in"""
+    from types import SimpleNamespace
+    homes = {name: tmp_path / folder for name, folder in [("alice", "a.smith"), ("bob", "bob"), ("daemon", "srv")]}
+    for home in homes.values():
+        home.mkdir()
+    storage = homes["alice"] / ".config" / "Code" / "User" / "workspaceStorage"
+    storage.mkdir(parents=True)
+    accounts = [SimpleNamespace(pw_name=name, pw_dir=str(home), pw_shell="/usr/sbin/nologin" if name == "daemon" else "/bin/bash")
+                for name, home in homes.items()] + [SimpleNamespace(pw_name="nobody", pw_dir="/", pw_shell="/bin/sh")]
+    monkeypatch.setattr("project.pwd", SimpleNamespace(getpwall=lambda: accounts), raising=False)
+    monkeypatch.setattr(platform, "system", lambda: "Linux")
+    assert WorkspaceSettings.profile_homes() == {"alice": str(homes["alice"]), "bob": str(homes["bob"])}
+    assert WorkspaceSettings.profile_users() == ["alice"]
+    settings = WorkspaceSettings(exe_path="code", workspace_path=str(tmp_path), username="tester")
+    assert settings.for_user("alice", str(homes["alice"])).workspace_path == str(storage)
+
+def test_store_update(tmp_path: Path):
+    """Test that concurrent updates of a stored file never lose a change and that unversioned files are upgraded"""
+    store = WorkspaceStore(str(tmp_path))
+    Path(store.file("orphans")).write_text(json.dumps({"old": {"first_missing": 1.0, "misses": 1}}), encoding="utf-8")
+    assert store.load("orphans", {}) == {"old": {"first_missing": 1.0, "misses": 1}}
+
+    def count() -> None:
+        for _ in range(25):
+            store.update("counter", lambda value: value + 1, 0)
+
+    threads = [threading.Thread(target=count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.load("counter") == 100
+    with store.lock("counter"):
+        with pytest.raises(TimeoutError):
+            store.save("counter", 0)
+        assert store.load("counter") == 100
+    Path(store.file("orphans")).write_text(json.dumps({"version": 99, "data": {}}), encoding="utf-8")
+    assert store.load("orphans", "default") == "default"
+
+def test_export(storage_settings: WorkspaceSettings, tmp_path: Path):
+    """Test streaming the workspace list as JSON Lines and CSV"""
+    storage = Path(storage_settings.workspace_path)
+    make_vsc_folder(storage, "aaaa", "file:///d%3A/Code/demo")
+    make_vsc_folder(storage, "bbbb", "file:///d%3A/Code/demo/")
+    make_vsc_folder(storage, "cccc", "file:///d%3A/Code/other")
+    wl = WorkspaceLocator(storage_settings, load=False)
+    assert wl._workspaces == []
+    records = wl.export_records()
+    assert next(records)["source"] == "vscode"
+    output = io.StringIO()
+    assert wl.export(output) == 2
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [list(line) for line in lines] == [list(WorkspaceLocator.export_fields)] * 2
+    assert all(line["exists"] is False and line["storage_size"] > 0 for line in lines)
+    assert len(wl.duplicates) == 1
+    output = io.StringIO()
+    assert wl.export(output, "csv") == 2
+    assert output.getvalue().splitlines()[0] == ",".join(WorkspaceLocator.export_fields)
+    with pytest.raises(ValueError):
+        wl.export(output, "xml")
+
+def test_source_roots(storage_settings: WorkspaceSettings, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test finding repositories under the source roots, skipping dependency folders and reusing unchanged folder listings"""
+    root = tmp_path / "src"
+    for repo in ["team/app", "lib", "team/app/node_modules/dep", "node_modules/dep", "a/b/c/too_deep"]:
+        (root / repo / ".git").mkdir(parents=True)
+    storage_settings.data_path = str(tmp_path / "data")
+    storage_settings.source_roots = [str(root)]
+    wl = WorkspaceLocator(storage_settings)
+    assert sorted(w.name for w in wl.workspaces) == ["app", "lib"]
+    assert {w.source for w in wl.workspaces} == {"folder"}
+    assert [w.name for w in wl.source_workspaces({Workspace.normalize_path(str(root / "lib"))})] == ["app"]
+    def no_scandir(folder: str):
+        raise AssertionError(f"{folder} was listed again")
+    monkeypatch.setattr("project.scandir", no_scandir)
+    assert wl.find_repositories() == [str(root / "lib"), str(root / "team" / "app")]
+    monkeypatch.undo()
+    # A repository added under a source root is found even when the VS Code storage (and so the snapshot) is unchanged
+    storage_settings.use_snapshot = True
+    WorkspaceLocator(storage_settings)
+    assert isinstance(WorkspaceLocator(storage_settings).workspaces, WorkspaceSnapshot)
+    (root / "team" / "api" / ".git").mkdir(parents=True)
+    workspaces = WorkspaceLocator(storage_settings).workspaces
+    assert not isinstance(workspaces, WorkspaceSnapshot)
+    assert sorted(w.name for w in workspaces) == ["api", "app", "lib"]
+
+def test_providers(storage_settings: WorkspaceSettings, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test reading JetBrains projects and running providers concurrently, leaving out a provider that is too slow"""
+    for project in ("IdeaProjects/api", "RiderProjects/Game"):
+        (tmp_path / project).mkdir(parents=True)
+    (tmp_path / "RiderProjects" / "Game" / "Game.sln").write_text("")
+    options = tmp_path / ".config" / "JetBrains" / "IntelliJIdea2024.1" / "options"
+    options.mkdir(parents=True)
+    (options / "recentProjects.xml").write_text("""<application><component name="RecentProjectsManager">
+        <option name="additionalInfo"><map><entry key="$USER_HOME$/IdeaProjects/api"><value /></entry>
+        <entry key="$USER_HOME$/RiderProjects/Game/Game.sln"><value /></entry></map></option></component></application>""")
+    monkeypatch.setattr(platform, "system", lambda: "Linux")
+    provider = JetBrainsProvider(storage_settings)
+    provider.home = str(tmp_path)
+    assert provider.folders() == [str(tmp_path / "IdeaProjects" / "api"), str(tmp_path / "RiderProjects" / "Game")]
+    assert [(w.name, w.source) for w in provider.workspaces()] == [("api", "jetbrains"), ("Game", "jetbrains")]
+
+    class FastProvider(WorkspaceProvider):
+        name = "fast"
+        def read(self) -> list[str]:
+            return [str(tmp_path / "IdeaProjects" / "api"), str(tmp_path / "IdeaProjects" / "api" / "")]
+
+    class SlowProvider(WorkspaceProvider):
+        name = "slow"
+        def read(self) -> list[str]:
+            time.sleep(2)
+            return [str(tmp_path / "RiderProjects" / "Game")]
+
+    monkeypatch.setitem(WorkspaceLocator.providers, "fast", FastProvider)
+    monkeypatch.setitem(WorkspaceLocator.providers, "slow", SlowProvider)
+    storage_settings.providers, storage_settings.provider_timeout = ["slow", "fast"], 0.5
+    started = time.monotonic()
+    workspaces = WorkspaceLocator(storage_settings).workspaces
+    assert time.monotonic() - started < 1.5
+    assert [(w.name, w.source) for w in workspaces] == [("api", "fast")]
+
+def test_daemon_thread_pool():
+    """Test that a hung call is abandoned on daemon workers instead of holding up the exit"""
+    release = threading.Event()
+    pool = DaemonThreadPool(max_workers=2, thread_name_prefix="test")
+    hung = pool.submit(release.wait)
+    assert pool.submit(sum, [1, 2, 3]).result(timeout=1) == 6
+    queued = [pool.submit(release.wait) for _ in range(2)]
+    pool.shutdown(wait=False, cancel_futures=True)
+    assert all(thread.daemon for thread in pool._threads)
+    assert queued[-1].cancelled()
+    assert not hung.done()
+    release.set()
+    assert hung.result(timeout=1)
+    with pytest.raises(RuntimeError):
+        pool.submit(sum, [])
+
+"""Test functions for the AsyncWorkspaceLocator Class"""
+
+def test_async_workspaces(storage_settings: WorkspaceSettings, tmp_path: Path):
+    """Test that async discovery matches synchronous discovery"""
+    storage = Path(storage_settings.workspace_path)
+    make_vsc_folder(storage, "aaaa", "file:///d%3A/Code/demo")
+    make_vsc_folder(storage, "bbbb", "file:///d%3A/Code/demo/")
+    make_vsc_folder(storage, "cccc", "file:///d%3A/Code/other")
+    wl = asyncio.run(AsyncWorkspaceLocator.create(storage_settings))
+    assert [w.display_name for w in wl.workspaces] == [w.display_name for w in WorkspaceLocator(storage_settings).workspaces]
+    assert len(wl.duplicates) == 1
+    assert wl.timed_out == []
+
+def test_async_workspaces_timeout(storage_settings: WorkspaceSettings, monkeypatch: pytest.MonkeyPatch):
+    """Test that a hung workspace folder does not block the other workspaces"""
+    storage = Path(storage_settings.workspace_path)
+    hung = make_vsc_folder(storage, "aaaa", "file:///d%3A/Code/hung")
+    make_vsc_folder(storage, "bbbb", "file:///d%3A/Code/demo")
+    from_workspace_folder = Workspace.from_workspace_folder
+    def slow_from_workspace_folder(workspace_folder: str, vsc_folder: str=None, *args) -> Workspace:
+        if vsc_folder == hung:
+            time.sleep(0.5)
+        return from_workspace_folder(workspace_folder, vsc_folder, *args)
+    monkeypatch.setattr(Workspace, "from_workspace_folder", slow_from_workspace_folder)
+    storage_settings.io_timeout = 0.1
+    started = time.monotonic()
+    wl = asyncio.run(AsyncWorkspaceLocator.create(storage_settings))
+    # asyncio.run does not wait for the hung worker when it shuts down
+    assert time.monotonic() - started < 0.4
+    assert len(wl.workspaces) == 1
+    assert wl.timed_out == [hung]
+    assert [w.name for w in wl.find("demo")] == ["demo"]
+    assert [w.name for w in wl.rank("demo", 10)] == ["demo"]
+    assert list(wl.group_index()[1]) == ["Code"]
+
+def test_async_workspaces_more_hung_than_workers(storage_settings: WorkspaceSettings, monkeypatch: pytest.MonkeyPatch):
+    """Test that folders queued behind hung ones are not timed out before they run"""
+    storage = Path(storage_settings.workspace_path)
+    hung = {make_vsc_folder(storage, f"hung{i}", f"file:///d%3A/Code/hung{i}") for i in range(5)}
+    for i in range(2):
+        make_vsc_folder(storage, f"demo{i}", f"file:///d%3A/Code/demo{i}")
+    release = threading.Event()
+    from_workspace_folder = Workspace.from_workspace_folder
+    def hanging_from_workspace_folder(workspace_folder: str, vsc_folder: str=None, *args) -> Workspace:
+        if vsc_folder in hung:
+            release.wait(5)
+        return from_workspace_folder(workspace_folder, vsc_folder, *args)
+    monkeypatch.setattr(Workspace, "from_workspace_folder", hanging_from_workspace_folder)
+    storage_settings.io_timeout = 0.1
+    storage_settings.max_concurrency = 2
+    started = time.monotonic()
+    try:
+        wl = asyncio.run(AsyncWorkspaceLocator.create(storage_settings))
+    finally:
+        release.set()
+    # Each abandoned call gets a replacement worker, so nothing waits for the hung calls to return
+    assert time.monotonic() - started < 2
+    assert sorted(w.name for w in wl.workspaces) == ["demo0", "demo1"]
+    assert set(wl.timed_out) == hung
+
+"""Test functions for the WorkspaceDetails and WorkspaceDetailsCache Classes"""
+
+@pytest.fixture
+def git_workspace(tmp_path: Path) -> Workspace:
+    """Workspace folder containing a git directory checked out on a branch"""
+    ws_folder = tmp_path / "project"
+    (ws_folder / ".git").mkdir(parents=True)
+    (ws_folder / ".git" / "HEAD").write_text("ref: refs/heads/feature/details\n")
+    (ws_folder / "src").mkdir()
+    (ws_folder / "src" / "main.py").write_bytes(b"x" * 1000)
+    return Workspace.from_workspace_folder(str(ws_folder))
+
+def test_details(git_workspace: Workspace):
+    """Test gathering workspace details"""
+    details = WorkspaceDetails()
+    details.load_git(git_workspace)
+    details.load_size(git_workspace)
+    assert details.branch == "feature/details"
+    assert details.size >= 1000 and details.size_exact
+    assert "Branch:      feature/details" in details.summary
+
+def test_details_cache(git_workspace: Workspace):
+    """Test that details are gathered in the background and then served from the cache"""
+    ready = threading.Event()
+    cache = WorkspaceDetailsCache(lambda w, d: ready.set() if d.size_time and d.git_time else None)
+    details = cache.get(git_workspace)
+    assert ready.wait(5)
+    assert cache.get(git_workspace) is details
+    assert details.branch == "feature/details"
+    cache.close()
+    # A size calculation hung on a network drive doesn't hold up the exit
+    assert all(thread.daemon for thread in cache._pool._threads)
+
+"""Test functions for the WorkspacePrefetcher Class"""
+
+def test_prefetch(git_workspace: Workspace, monkeypatch: pytest.MonkeyPatch):
+    """Test that only source files within the size caps are read ahead"""
+    ws_folder = Path(git_workspace.workspace)
+    (ws_folder / "node_modules").mkdir()
+    (ws_folder / "node_modules" / "lib.js").write_bytes(b"x" * 1000)
+    (ws_folder / "src" / "large.bin").write_bytes(b"x" * 3000)
+    settings = WorkspaceSettings(exe_path="code", workspace_path=str(ws_folder), username="tester",
+                                 prefetch_file_mb=2000 / 1024 / 1024, prefetch_mb_per_second=1000.0)
+    prefetcher = WorkspacePrefetcher(settings)
+    files = set(prefetcher.source_files(str(ws_folder)))
+    assert str(ws_folder / "src" / "main.py") in files
+    assert not any("node_modules" in file or ".git" in file for file in files)
+    assert prefetcher.prefetch(str(ws_folder)) == 1000
+    cancelled = threading.Event()
+    cancelled.set()
+    assert prefetcher.prefetch(str(ws_folder), cancelled) == 0
+    # A detached prefetch runs the launcher again with --prefetch, outside of the launcher's process
+    started = []
+    monkeypatch.setattr("project.subprocess.Popen", lambda args, **kwargs: started.append((args, kwargs)))
+    WorkspacePrefetcher(settings, "custom.json").detach(git_workspace)
+    assert started[0][0][-3:] == ["custom.json", "--prefetch", git_workspace.workspace]
+    assert started[0][1]["start_new_session"]
+
+"""Test functions for the WorkspaceWeight and WorkspaceWeightAnalyzer Classes"""
+
+def test_weight(git_workspace: Workspace, tmp_path: Path):
+    """Test sampling top-level folders, the weight levels and the suggested exclude settings"""
+    ws_folder = Path(git_workspace.workspace)
+    (ws_folder / "node_modules" / "lib").mkdir(parents=True)
+    for i in range(30):
+        (ws_folder / "node_modules" / "lib" / f"{i}.js").write_bytes(b"x" * 10)
+    settings = WorkspaceSettings(exe_path="code", workspace_path=str(tmp_path), username="tester", data_path=str(tmp_path / "data"),
+                                 weight_heavy_files=20)
+    weight = WorkspaceWeightAnalyzer(settings).analyze([git_workspace])[git_workspace.workspace]
+    assert set(weight.folders) == {".", "src", "node_modules"}
+    assert weight.files == 31 and weight.size == 1300 and weight.exact
+    assert weight.level(20) == "heavy" and weight.level(3) == "huge" and weight.level(100) == "light"
+    assert weight.heaviest(1) == ["node_modules"]
+    assert weight.suggest_excludes(10) == {"files.watcherExclude": {"node_modules/**": True}, "search.exclude": {"node_modules/**": True}}
+    analyzer = WorkspaceWeightAnalyzer(settings)
+    assert analyzer.get(git_workspace.workspace) == weight
+    assert analyzer.marker(git_workspace.workspace) == "  [heavy: 31 files]"
+    assert not analyzer.stale(git_workspace)
+
+"""Test functions for the VSCodeState Class"""
+
+def make_state_db(storage: Path, folder_uris: list[str]) -> None:
+    """Create a global state database listing recently opened folders"""
+    global_storage = storage.parent / "globalStorage"
+    global_storage.mkdir(exist_ok=True)
+    connection = sqlite3.connect(global_storage / "state.vscdb")
+    connection.execute("CREATE TABLE ItemTable (key TEXT UNIQUE ON CONFLICT REPLACE, value BLOB)")
+    recent = {"entries": [{"folderUri": uri} for uri in folder_uris] + [{"fileUri": "file:///d%3A/notes.txt"}]}
+    connection.execute("INSERT INTO ItemTable VALUES (?, ?)", (VSCodeState.recent_key, json.dumps(recent)))
+    connection.commit()
+    connection.close()
+
+def test_recent_folders(storage_settings: WorkspaceSettings):
+    """Test reading the recently opened folders from the global state database"""
+    storage = Path(storage_settings.workspace_path)
+    make_state_db(storage, ["file:///d%3A/Code/other", "vscode-remote://ssh-remote%2Bhost/src", "file:///d%3A/Code/demo"])
+    if platform.system() == "Windows":
+        assert VSCodeState(str(storage)).recent_folders() == ["d:\\Code\\other", "d:\\Code\\demo"]
+    else:
+        # On the host running VS Code Server, remote folders are local
+        assert VSCodeState(str(storage)).recent_folders() == ["/d:/Code/other", "/src", "/d:/Code/demo"]
+    assert VSCodeState(str(storage / "missing")).recent_folders() == []
+
+def test_sort_by_recent(storage_settings: WorkspaceSettings):
+    """Test sorting workspaces by VS Code's recently opened list and finding stale workspaces"""
+    storage = Path(storage_settings.workspace_path)
+    make_vsc_folder(storage, "aaaa", "file:///d%3A/Code/demo")
+    make_vsc_folder(storage, "bbbb", "file:///d%3A/Code/other")
+    make_vsc_folder(storage, "cccc", "file:///d%3A/Code/old")
+    os.utime(storage / "cccc", (0, 0))
+    make_state_db(storage, ["file:///d%3A/Code/other", "file:///d%3A/Code/demo"])
+    storage_settings.sort_by = "recent"
+    wl = WorkspaceLocator(storage_settings)
+    assert [w.recent_rank for w in wl.workspaces] == [0, 1, None]
+    assert [w.vsc_folder for w in wl.stale_workspaces(30)] == [str(storage / "cccc")]
+
+"""Test functions for the WorkspaceSnapshot Class"""
+
+def test_snapshot(storage_settings: WorkspaceSettings, tmp_path: Path):
+    """Test that a second locator loads the snapshot saved by the first until the storage folder changes"""
+    storage = Path(storage_settings.workspace_path)
+    make_vsc_folder(storage, "aaaa", "file:///d%3A/Code/demo")
+    make_vsc_folder(storage, "bbbb", "file:///d%3A/Code/other")
+    storage_settings.data_path = str(tmp_path / "data")
+    storage_settings.use_snapshot = True
+    scanned = WorkspaceLocator(storage_settings)
+    assert not isinstance(scanned.workspaces, WorkspaceSnapshot)
+    loaded = WorkspaceLocator(storage_settings)
+    assert isinstance(loaded.workspaces, WorkspaceSnapshot)
+    assert WorkspaceLocator.display_names(loaded.workspaces) == WorkspaceLocator.display_names(scanned.workspaces)
+    assert list(loaded.workspaces) == list(scanned.workspaces)
+    assert len(loaded.find("OTHER")) == 1
+    assert loaded.workspaces[0] in loaded.workspaces
+    loaded.workspaces.close()
+    make_vsc_folder(storage, "cccc", "file:///d%3A/Code/new")
+    os.utime(storage, (time.time() + 10, time.time() + 10))
+    assert not isinstance(WorkspaceLocator(storage_settings).workspaces, WorkspaceSnapshot)
+    # The background refresh updates Workspace objects, so it replaces the snapshot rows with them
+    loaded = WorkspaceLocator(storage_settings)
+    snapshot = loaded.workspaces
+    scheduler = WorkspaceRefreshScheduler(loaded, lambda w: None)
+    assert isinstance(loaded.workspaces, list)
+    assert [w.name for w in loaded.workspaces] == [w.name for w in snapshot]
+    scheduler.stop()
+    snapshot.close()
+
+def test_snapshot_save_failure(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that a snapshot that can't replace the old one leaves no temporary file behind"""
+    def locked_replace(source: str, target: str) -> None:
+        raise PermissionError(13, "The process cannot access the file", target)
+    monkeypatch.setattr(os, "replace", locked_replace)
+    snapshot_file = tmp_path / "data" / "workspaces.snapshot"
+    with pytest.raises(PermissionError):
+        WorkspaceSnapshot.save(str(snapshot_file), [Workspace(None, "d:\\Code\\demo", "demo", "Code", None, True)], 0, 0.0)
+    assert list(snapshot_file.parent.iterdir()) == []
+
+def test_rank(storage_settings: WorkspaceSettings):
+    """Test ranking workspaces for the quick pick UI"""
+    wl = WorkspaceLocator(storage_settings)
+    wl._workspaces = [Workspace(None, f"d:\\{parent}\\{name}", name, parent, None, True)
+                      for parent, name in [("Code", "relaunch"), ("Launch", "notes"), ("Code", "workspace-launcher"), ("Code", "launcher")]]
+    assert [w.name for w in wl.rank("launch", 10)] == ["launcher", "workspace-launcher", "relaunch", "notes"]
+    assert len(wl.rank("launch", 2)) == 2
+    assert [w.name for w in wl.rank("code launch", 10)] == ["launcher", "workspace-launcher", "relaunch"]
+    assert wl.rank("missing", 10) == []
+
+def test_group_index(storage_settings: WorkspaceSettings):
+    """Test grouping workspaces by parent folder and repository host for the tree UI"""
+    wl = WorkspaceLocator(storage_settings)
+    wl._workspaces = [Workspace(None, f"d:\\{parent}\\{name}", name, parent, uri, True, repo_host=host)
+                      for parent, name, uri, host in [("Code", "a", "git@github.com:o/a", "github"), ("apps", "b", None, None),
+                                                      ("Code", "c", "https://gitlab.com/o/c", "gitlab")]]
+    workspaces, groups = wl.group_index()
+    assert groups == {"apps": [1], "Code": [0, 2]}
+    assert wl.group_index()[1] is groups
+    assert [workspaces[i].name for i in groups["Code"]] == ["a", "c"]
+    assert WorkspaceLocator.group_workspaces(workspaces, "host") == {"(no repository)": [1], "github": [0], "gitlab": [2]}
+
+def test_find_query(storage_settings: WorkspaceSettings):
+    """Test field-qualified filter queries"""
+    wl = WorkspaceLocator(storage_settings)
+    wl._workspaces = [Workspace(None, f"d:\\{parent}\\{name}", name, parent, uri, exists, repo_host=host)
+                      for parent, name, uri, host, exists in [
+                          ("Bitbucket", "inversion", "https://bitbucket.org/team/inversion", "bitbucket", True),
+                          ("Code", "archive-tool", "git@github.com:me/archive-tool", "github", True),
+                          ("Code", "notes", None, None, False)]]
+    assert [w.name for w in wl.find("parent:bitbucket")] == ["inversion"]
+    assert [w.name for w in wl.find("host:github")] == ["archive-tool"]
+    assert [w.name for w in wl.find("missing:true")] == ["notes"]
+    assert [w.name for w in wl.find("repo:inversion")] == ["inversion"]
+    assert [w.name for w in wl.find("code -archive")] == ["notes"]
+    assert [w.name for w in wl.find("CODE > ARCH")] == ["archive-tool"]
+    assert len(wl.find("")) == 3
+
+"""Test functions for the WorkspaceRefreshScheduler Class"""
+
+def test_refresh_scheduler(storage_settings: WorkspaceSettings, tmp_path: Path):
+    """Test that due workspaces are re-checked within the budget and that changes are reported"""
+    storage_settings.refresh_min_interval = 0
+    storage_settings.refresh_budget = 1
+    wl = WorkspaceLocator(storage_settings)
+    wl._workspaces = [Workspace(None, str(tmp_path / name), name, "tmp", None, False, recent_rank=rank) for rank, name in enumerate(["a", "b"])]
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    changes = []
+    scheduler = WorkspaceRefreshScheduler(wl, changes.append)
+    assert scheduler.tick() == 1
+    assert scheduler.tick() == 1
+    assert changes == wl._workspaces
+    assert all(w.exists for w in wl._workspaces)
+    make_vsc_folder(Path(storage_settings.workspace_path), "aaaa", "file:///d%3A/Code/demo")
+    os.utime(storage_settings.workspace_path, (time.time() + 10, time.time() + 10))
+    assert scheduler.tick() == 0
+    scheduler._busy.result()
+    assert changes[-1] is None
+    assert len(wl._workspaces) == 1
+    scheduler.stop()
+    assert all(thread.daemon for thread in scheduler._pool._threads)
+
+"""Test functions for the WorkspaceLauncher Class"""
+
+def test_terminal(storage_settings: WorkspaceSettings):
+    """Test filtering and moving through the matches of the terminal UI"""
+    storage = Path(storage_settings.workspace_path)
+    for name in ["demo", "other", "notes"]:
+        make_vsc_folder(storage, name, f"file:///d%3A/Code/{name}")
+    terminal = WorkspaceTerminal(storage_settings)
+    assert len(terminal._matches) == 3
+    terminal.on_move(5)
+    assert terminal._index == 2
+    terminal.on_query_change("o")
+    assert sorted(w.name for w in terminal._matches) == ["demo", "notes", "other"]
+    terminal.on_query_change("oth")
+    assert [w.name for w in terminal._matches] == ["other"]
+    assert terminal._index == 0
+    terminal.on_move(-1)
+    assert terminal._index == 0
+
+def test_vscode_args(storage_settings: WorkspaceSettings):
+    """Test the command line used to open a workspace in VS Code"""
+    assert WorkspaceLauncher.vscode_args(storage_settings, "d:\\Code\\demo") == ["code", "d:\\Code\\demo"]
+    storage_settings.window_mode = "reuse"
+    assert WorkspaceLauncher.vscode_args(storage_settings, "d:\\Code\\demo") == ["code", "--reuse-window", "d:\\Code\\demo"]
+
+def test_launcher_close(storage_settings: WorkspaceSettings):
+    """Test that every launcher UI shares the setup and stops the shared background helpers when it closes"""
+    from types import SimpleNamespace
+    storage_settings.show_weight, storage_settings.prefetch = True, True
+    for launcher_class in (WorkspaceLauncher, WorkspaceQuickPick, WorkspaceTree):
+        launcher = launcher_class.__new__(launcher_class)
+        launcher._init_launcher(storage_settings, "custom.json")
+        assert launcher._prefetcher._settings_file == "custom.json"
+        closed = []
+        launcher.window = SimpleNamespace(close=lambda: closed.append(True))
+        launcher._close_window()
+        assert closed and launcher._weights._pool._shutdown
+
+def test_launch_batch(storage_settings: WorkspaceSettings, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that a batch launch reports early failures and leaves running VS Code processes alone"""
+    import sys
+    from types import SimpleNamespace
+    import project
+    # The fake "VS Code" is the Python interpreter and each workspace folder is a script for it to run
+    (tmp_path / "fails.py").write_text("import sys\nsys.exit('cannot open folder')\n")
+    (tmp_path / "stays.py").write_text("import time\ntime.sleep(3)\n")
+    storage_settings.exe_path = sys.executable
+    storage_settings.batch_delay = 0.0
+    monkeypatch.setattr(WorkspaceLauncher, "launch_wait", 1.0)
+    errors = []
+    monkeypatch.setattr(project, "sg", SimpleNamespace(popup_error=lambda *lines, **kwargs: errors.extend(lines[1:])))
+    class FakeElement:
+        def __init__(self):
+            self.events, self.value = [], None
+        def write_event_value(self, key, value):
+            self.events.append((key, value))
+        def update(self, value):
+            self.value = value
+    launcher = WorkspaceLauncher.__new__(WorkspaceLauncher)
+    launcher._settings, launcher.window, launcher.status_text = storage_settings, FakeElement(), FakeElement()
+    workspaces = [Workspace(workspace=str(tmp_path / script), name=script, parent="batch", exists=True) for script in ("fails.py", "stays.py")]
+    launcher._batch = [len(workspaces), 0, []]
+    started = time.monotonic()
+    launcher._launch_batch(workspaces)
+    assert time.monotonic() - started < 3
+    assert sorted(key for key, _ in launcher.window.events) == ["-BATCH-", "-BATCH-"]
+    for _, (workspace, error) in launcher.window.events:
+        launcher.on_batch_progress(workspace, error)
+    assert launcher.status_text.value == "Opened 1 of 2 workspaces (1 failed)"
+    assert errors == ["batch > fails.py: cannot open folder"]
+
+def test_single_instance(storage_settings: WorkspaceSettings, tmp_path: Path):
+    """Test that a second launcher signals the one holding the lock instead of starting"""
+    import socket
+    storage_settings.io_timeout = 1.0
+    storage_settings.data_path = str(tmp_path / "data")
+    first = WorkspaceInstance(storage_settings)
+    first.port = 0
+    assert first.acquire()
+    storage_settings.instance_port = first._server.getsockname()[1]
+    second = WorkspaceInstance(storage_settings)
+    assert not second.acquire()
+    assert not second.signal()
+    shown = threading.Event()
+    first.serve(shown.set)
+    assert second.signal()
+    assert shown.is_set()
+    # Another local user can connect, but doesn't know the token
+    shown.clear()
+    with socket.create_connection(("127.0.0.1", storage_settings.instance_port), timeout=1.0) as intruder:
+        intruder.sendall(WorkspaceInstance.show_request + b"0" * WorkspaceInstance.token_bytes * 2)
+        assert intruder.recv(len(WorkspaceInstance.show_reply)) == b""
+    assert not shown.is_set()
+    if os.name == "posix":
+        assert os.stat(second.token_file).st_mode & 0o077 == 0
+    first.close()
+    assert second.acquire()
+    second.close()
+    assert WorkspaceInstance.default_port("Tester") == WorkspaceInstance.default_port("tester")
+
+def test_vscode_running():
+    """Test that a process that isn't running is not reported as running"""
+    assert not WorkspaceLauncher.vscode_running("C:\\Invalid\\not-a-running-process.exe")